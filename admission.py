@@ -0,0 +1,156 @@
+"""
+admission.py
+
+Admission control for model inference in `main.py`'s /predict.
+
+At most `max_inflight` requests run inference at once, in the threadpool.
+Up to `max_queue` more wait in FIFO order. Beyond that, requests are rejected
+straight away with 503 and a Retry-After estimate instead of piling up.
+
+Each request may carry a deadline (X-Request-Timeout or X-Request-Deadline,
+see `parse_deadline`). A request whose deadline passes while it is queued, or
+that arrives already expired, is dropped before inference with 504. Its
+client has given up, so running the model would only delay everyone else.
+
+Sampled background inference (cascade verification, shadow scoring) runs in
+the threadpool outside any slot. `allow_background()` skips it while requests
+are queued for a slot, so under overload it adds no model load. Skips are
+counted per kind.
+
+GET /admission/stats reports accepted/shed counts, current in-flight and
+queue depth, background skips, and queue-wait percentiles.
+
+"""
+import asyncio
+import math
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from latency_stats import percentiles
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: int | None = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str] | None:
+        return {"Retry-After": str(self.retry_after)} if self.retry_after is not None else None
+
+
+def parse_deadline(headers, now: float | None = None, default_timeout: float | None = None) -> float | None:
+    """Absolute `time.monotonic()` deadline from request headers, or None.
+
+    X-Request-Timeout: seconds the client is willing to wait, counted from arrival.
+    X-Request-Deadline: absolute Unix timestamp (seconds).
+    Raises ValueError on malformed values.
+    """
+    now = time.monotonic() if now is None else now
+    timeout = headers.get("x-request-timeout")
+    if timeout is not None:
+        return now + float(timeout)
+    deadline = headers.get("x-request-deadline")
+    if deadline is not None:
+        return now + (float(deadline) - time.time())
+    if default_timeout:
+        return now + default_timeout
+    return None
+
+
+class AdmissionController:
+    def __init__(self, max_inflight: int = 4, max_queue: int = 32, window: int = 10000):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.inflight = 0
+        self._waiters: deque = deque()
+        self.counters = {"accepted": 0, "completed": 0, "shed_queue_full": 0, "shed_deadline": 0}
+        self.queue_wait_ms = deque(maxlen=window)
+        self.service_ms = deque(maxlen=window)
+        self.background_skipped: Counter = Counter()
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue should have drained, from recent service times."""
+        recent = list(self.service_ms)[-100:]
+        per_request_s = (sum(recent) / len(recent) / 1000) if recent else 0.1
+        return max(1, math.ceil((len(self._waiters) + 1) * per_request_s / self.max_inflight))
+
+    def allow_background(self, kind: str) -> bool:
+        """Whether optional background inference of `kind` may run now (False while requests queue)."""
+        if self._waiters:
+            self.background_skipped[kind] += 1
+            return False
+        return True
+
+    async def acquire(self, deadline: float | None = None) -> float:
+        """Wait for an inference slot; returns queue wait in ms or raises `Rejected`."""
+        t0 = time.monotonic()
+        if deadline is not None and t0 >= deadline:
+            self.counters["shed_deadline"] += 1
+            raise Rejected(504, "Request deadline already passed")
+        if self.inflight < self.max_inflight and not self._waiters:
+            self.inflight += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self.counters["shed_queue_full"] += 1
+                raise Rejected(503, "Server overloaded, try again later", self.retry_after())
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await asyncio.wait_for(fut, None if deadline is None else deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                self._abandon(fut)
+                self.counters["shed_deadline"] += 1
+                raise Rejected(504, "Request deadline passed while queued")
+            except asyncio.CancelledError:  # client went away
+                self._abandon(fut)
+                raise
+        waited = (time.monotonic() - t0) * 1000
+        self.queue_wait_ms.append(waited)
+        self.counters["accepted"] += 1
+        return waited
+
+    def _abandon(self, fut: asyncio.Future):
+        if fut.done() and not fut.cancelled():
+            self.release()  # a slot was handed over just as we gave up
+        else:
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass
+
+    def release(self):
+        # hand the slot straight to the next live waiter, FIFO
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.inflight -= 1
+
+    @asynccontextmanager
+    async def slot(self, deadline: float | None = None):
+        waited = await self.acquire(deadline)
+        t0 = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self.service_ms.append((time.perf_counter() - t0) * 1000)
+            self.counters["completed"] += 1
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_inflight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            **self.counters,
+            "background_skipped": dict(self.background_skipped),
+            "queue_wait_ms": percentiles(self.queue_wait_ms),
+            "service_ms": percentiles(self.service_ms),
+        }
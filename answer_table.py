@@ -0,0 +1,196 @@
+"""
+answer_table.py
+
+Precomputed top-k answers for the most frequent symptom combinations.
+
+A table is a directory `table_<model_version>/` with:
+- keys.npy      uint64 (n,)    64-bit hash of the canonical symptom set, sorted
+- classes.npy   uint16 (n, k)  disease index into meta["diseases"]
+- probs.npy     float32 (n, k) probability, -1 past the end of a short list
+- urgency.npy   uint8 (n,)     index into meta["urgency"] (no-description urgency)
+- meta.json     model_version, top_k, diseases, urgency levels, and the symptom
+                sets (used only to rebuild the table for a new model)
+
+The arrays are opened with mmap_mode="r", so several workers share one copy
+through the page cache, and nothing is built per process. A lookup hashes
+the request's canonical symptom set (`symptom_key`) and binary-searches
+keys.npy. The hash uses names, not `symptom_vocab` bit IDs, which differ
+between processes. A request with a symptom outside the table's set misses
+and goes to the model.
+
+`main.py` serves a table only when its model_version matches the loaded
+model. On startup it rebuilds a table for the current version from the
+newest existing table's symptom sets (see `ensure_table`).
+`precompute_table.py` builds one offline from logs and a frequency file.
+
+"""
+import csv
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List
+
+import numpy as np
+
+from symptom_vocab import canonical_set
+
+
+def symptom_key(symptoms: Iterable[str]) -> int:
+    """Stable 64-bit hash of the canonical symptom set."""
+    digest = hashlib.blake2b("\x1f".join(canonical_set(symptoms)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def table_path(root: str, model_version: str) -> str:
+    return os.path.join(root, f"table_{model_version}")
+
+
+def collect_combinations(freq_path: str | None = None, audit_dir: str | None = None,
+                         extra: Iterable[Iterable[str]] = (), limit: int = 5000) -> List[tuple]:
+    """Most frequent canonical symptom sets, most common first.
+
+    freq_path: CSV with a `symptoms` column (';'-separated) and an optional `count`.
+    audit_dir: `audit_log.py` output; every logged /predict request counts once.
+    extra: sets that are always included (presets, samples).
+    """
+    counts: Counter = Counter()
+    if freq_path:
+        with open(freq_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                combo = canonical_set(row.get("symptoms", "").split(";"))
+                if combo:
+                    counts[combo] += int(row.get("count") or 1)
+    if audit_dir:
+        for path in sorted(glob.glob(os.path.join(audit_dir, "audit_*.jsonl.gz"))):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        request = json.loads(line).get("request")
+                    except ValueError:
+                        continue  # torn line from a crashed writer
+                    symptoms = request.get("symptoms", []) if isinstance(request, dict) else request
+                    combo = canonical_set(symptoms or []) if isinstance(symptoms, list) else ()
+                    if combo:
+                        counts[combo] += 1
+    pinned = [c for c in (canonical_set(e) for e in extra) if c]
+    pinned_set = set(pinned)
+    ranked = [c for c, _ in counts.most_common() if c not in pinned_set]
+    return list(dict.fromkeys(pinned + ranked))[:max(limit, len(pinned))]
+
+
+def build_table(root: str, symptom_sets: List[tuple], score_fn: Callable, urgency_fn: Callable,
+                model_version: str, top_k: int = 10, batch_size: int = 1024) -> str:
+    """Score `symptom_sets` in bulk and write `table_<model_version>/` under `root`.
+
+    score_fn(list of symptom tuples) -> list of [{"disease", "probability"}, ...] per set;
+    urgency_fn(symptoms, description) -> {"level", "recommendation"}.
+    """
+    symptom_sets = list(dict.fromkeys(canonical_set(s) for s in symptom_sets if s))
+    n = len(symptom_sets)
+    keys = np.empty(n, dtype=np.uint64)
+    classes = np.zeros((n, top_k), dtype=np.uint16)
+    probs = np.full((n, top_k), -1, dtype=np.float32)
+    urgency_idx = np.zeros(n, dtype=np.uint8)
+    diseases: Dict[str, int] = {}
+    urgencies: Dict[tuple, int] = {}
+
+    for start in range(0, n, batch_size):
+        chunk = symptom_sets[start:start + batch_size]
+        for row, (combo, preds) in enumerate(zip(chunk, score_fn(chunk)), start=start):
+            keys[row] = symptom_key(combo)
+            for j, p in enumerate(preds[:top_k]):
+                classes[row, j] = diseases.setdefault(p["disease"], len(diseases))
+                probs[row, j] = p["probability"]
+            urgency = urgency_fn(list(combo), "")
+            urgency_idx[row] = urgencies.setdefault((urgency["level"], urgency["recommendation"]), len(urgencies))
+
+    order = np.argsort(keys, kind="stable")  # sorted keys: lookups are a binary search on the mmap
+    keys, classes, probs, urgency_idx = keys[order], classes[order], probs[order], urgency_idx[order]
+    if n > 1 and np.any(keys[1:] == keys[:-1]):
+        raise ValueError("Symptom-set hash collision; rebuild with a different set list")
+
+    os.makedirs(root, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".table_", dir=root)
+    np.save(os.path.join(tmp, "keys.npy"), keys)
+    np.save(os.path.join(tmp, "classes.npy"), classes)
+    np.save(os.path.join(tmp, "probs.npy"), probs)
+    np.save(os.path.join(tmp, "urgency.npy"), urgency_idx)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_version": model_version,
+            "top_k": top_k,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "diseases": list(diseases),
+            "urgency": [{"level": l, "recommendation": r} for l, r in urgencies],
+            "symptom_sets": [list(c) for c in symptom_sets],
+        }, f)
+    final = table_path(root, model_version)
+    if os.path.exists(final):
+        shutil.rmtree(final)
+    os.replace(tmp, final)  # readers never see a half-written table
+    return final
+
+
+class AnswerTable:
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.model_version = self.meta["model_version"]
+        self.keys = np.load(os.path.join(path, "keys.npy"), mmap_mode="r")
+        self.classes = np.load(os.path.join(path, "classes.npy"), mmap_mode="r")
+        self.probs = np.load(os.path.join(path, "probs.npy"), mmap_mode="r")
+        self.urgency = np.load(os.path.join(path, "urgency.npy"), mmap_mode="r")
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, symptoms: Iterable[str]):
+        """(predictions, no-description urgency) for a precomputed set, else None."""
+        key = np.uint64(symptom_key(symptoms))
+        row = int(np.searchsorted(self.keys, key))
+        if row >= len(self.keys) or self.keys[row] != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        diseases = self.meta["diseases"]
+        predictions = [
+            {"disease": diseases[c], "probability": float(p)}
+            for c, p in zip(self.classes[row], self.probs[row]) if p >= 0
+        ]
+        return predictions, dict(self.meta["urgency"][int(self.urgency[row])])
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "path": self.path,
+            "model_version": self.model_version,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else None,
+        }
+
+
+def ensure_table(root: str, model_version: str, score_fn: Callable, urgency_fn: Callable,
+                 extra: Iterable[Iterable[str]] = ()) -> AnswerTable | None:
+    """Load the table for `model_version`, rebuilding it from the newest other table if missing."""
+    current = table_path(root, model_version)
+    if not os.path.exists(os.path.join(current, "meta.json")):
+        previous = sorted(glob.glob(os.path.join(root, "table_*", "meta.json")), key=os.path.getmtime)
+        if not previous:
+            return None
+        with open(previous[-1], encoding="utf-8") as f:
+            meta = json.load(f)
+        sets = collect_combinations(extra=list(extra) + meta["symptom_sets"], limit=len(meta["symptom_sets"]))
+        print(f"🔁 Rebuilding answer table for model {model_version} ({len(sets)} combinations)")
+        build_table(root, sets, score_fn, urgency_fn, model_version, top_k=meta["top_k"])
+    return AnswerTable(current)
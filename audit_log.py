@@ -0,0 +1,171 @@
+"""
+audit_log.py
+
+Non-blocking audit trail for triage decisions.
+
+`AuditSink.record()` only does an in-memory `put_nowait`, so the request path
+never touches the disk. A background task drains the queue in batches and
+appends them (off the event loop, via a worker thread) to gzip-compressed
+JSONL files that rotate by size. If the disk falls behind, the bounded queue
+fills up and new records are dropped and counted instead of slowing requests.
+`stop()` signals the flusher, which finishes its current write, drains
+whatever is still buffered and exits. Rotated files are kept; pass
+`max_files` to opt in to deleting the oldest ones.
+
+Read a file back with:
+    gzip.open(path, "rt") -> one JSON record per line
+
+"""
+import asyncio
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+
+class AuditSink:
+    def __init__(
+        self,
+        directory: str,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_file_bytes: int = 50 * 1024 * 1024,
+        max_files: int | None = None,
+    ):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._current_file: str | None = None
+        self._file_seq = 0
+        self.counters = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped_queue_full": 0,
+            "dropped_write_error": 0,
+            "batches": 0,
+            "rotations": 0,
+        }
+        self._queue_high_water = 0
+        self._last_write_ms = 0.0
+        self._max_write_ms = 0.0
+
+    # ---------------- request path ----------------
+    def record(self, record: Dict[str, Any]) -> bool:
+        """Enqueue a record without blocking. Returns False (and counts a drop) when full."""
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.counters["dropped_queue_full"] += 1
+            return False
+        self.counters["enqueued"] += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        self._queue_high_water = max(self._queue_high_water, self._queue.qsize())
+        return True
+
+    # ---------------- lifecycle ----------------
+    async def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write everything still queued."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            # the flusher exits on its own once the queue is empty
+            await self._task
+            self._task = None
+        while not self._queue.empty():
+            await self._flush(self._drain(self.batch_size))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "queue_depth": self._queue.qsize(),
+            "queue_high_water": self._queue_high_water,
+            "last_write_ms": round(self._last_write_ms, 3),
+            "max_write_ms": round(self._max_write_ms, 3),
+            "current_file": self._current_file,
+        }
+
+    # ---------------- background flushing ----------------
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = self._drain(self.batch_size)
+            if batch:
+                await self._flush(batch)
+                continue
+            if self._stopping:
+                return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        t0 = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+        except Exception as e:
+            print(f"Audit write failed ({len(batch)} records dropped): {e}")
+            self.counters["dropped_write_error"] += len(batch)
+            return
+        self._last_write_ms = (time.perf_counter() - t0) * 1000
+        self._max_write_ms = max(self._max_write_ms, self._last_write_ms)
+        self.counters["written"] += len(batch)
+        self.counters["batches"] += 1
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        path = self._target_file()
+        payload = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in batch)
+        # Each batch is appended as its own gzip member; gzip readers concatenate them
+        with gzip.open(path, "ab") as f:
+            f.write(payload.encode("utf-8"))
+
+    def _target_file(self) -> str:
+        if self._current_file and os.path.exists(self._current_file) \
+                and os.path.getsize(self._current_file) < self.max_file_bytes:
+            return self._current_file
+        if self._current_file:
+            self.counters["rotations"] += 1
+        self._file_seq += 1
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"audit_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self._file_seq:04d}.jsonl.gz"
+        self._current_file = os.path.join(self.directory, name)
+        self._prune_old_files()
+        return self._current_file
+
+    def _prune_old_files(self):
+        if self.max_files is None:
+            return
+        files = sorted(
+            f for f in os.listdir(self.directory) if f.startswith("audit_") and f.endswith(".jsonl.gz")
+        )
+        for f in files[:max(0, len(files) - self.max_files + 1)]:
+            try:
+                os.remove(os.path.join(self.directory, f))
+            except OSError:
+                pass
@@ -0,0 +1,170 @@
+"""
+bench_symptom_vocab.py
+
+Old (lists / sets of strings) vs. new (`symptom_vocab` bitsets) symptom-set
+representation: memory for a batch of parsed requests, and per-request CPU
+for the hot paths that changed.
+
+- memory: lists as parsed from JSON, the normalized `set`s the old code built
+  per request, int bitsets, and one packed uint8 batch array;
+- heuristic_scores: per-disease set intersection vs. mask & popcount
+  (`mock_predict_server.py`, cascade tier 1);
+- urgency: set intersection vs. mask test (`main.py`);
+- feature frame: dict DataFrame + column reindex vs. `FeatureMap` gather
+  (`main.py` /predict);
+- cache key: sorted normalized tuple vs. bitset.
+
+The "old" functions below are the pre-vocabulary implementations, kept here
+only for comparison.
+
+Usage:
+    python bench_symptom_vocab.py --requests 10000
+Results are saved to outputs/vocab_bench_{timestamp}.csv and .md.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+from mock_predict_server import _DISEASE_SYMPTOMS, heuristic_scores
+from presets import SYMPTOMS
+from symptom_vocab import VOCAB, FeatureMap, canonical
+
+
+def _old_normalize(symptoms):
+    return {s.lower().replace(" ", "_") for s in symptoms}
+
+
+def _old_heuristic_scores(symptoms: List[str], description: str = "") -> Dict[str, float]:
+    given = _old_normalize(symptoms)
+    desc = (description or "").lower()
+    raw_scores = {}
+    for disease, attrs in _DISEASE_SYMPTOMS.items():
+        base = len(attrs & given) / max(1, len(attrs))
+        desc_boost = sum(0.12 for tok in disease.split() if tok in desc)
+        raw_scores[disease] = max(0.0, base + desc_boost)
+    return raw_scores
+
+
+_OLD_HIGH = {"chest_pain", "shortness_of_breath", "severe_breathing"}
+_OLD_LOW = {"fever", "cough", "fatigue"}
+_NEW_HIGH = VOCAB.mask(_OLD_HIGH)
+_NEW_LOW = VOCAB.mask(_OLD_LOW)
+
+
+def _old_urgency_level(symptoms) -> str:
+    given = _old_normalize(symptoms)
+    return "high" if given & _OLD_HIGH else ("medium" if given & _OLD_LOW else "low")
+
+
+def _new_urgency_level(symptoms) -> str:
+    given = VOCAB.bits(symptoms)
+    return "high" if given & _NEW_HIGH else ("medium" if given & _NEW_LOW else "low")
+
+
+def _old_input_frame(symptoms, feature_names):
+    input_df = pd.DataFrame([{symptom: 1 for symptom in symptoms}])
+    for col in feature_names:
+        if col not in input_df:
+            input_df[col] = 0
+    return input_df[feature_names]
+
+
+def make_requests(n: int, seed: int = 0) -> List[List[str]]:
+    """Realistic parsed requests: 1-6 symptoms each, fresh string objects as from json.loads."""
+    rng = random.Random(seed)
+    pool = sorted(set(SYMPTOMS) | {s for attrs in _DISEASE_SYMPTOMS.values() for s in attrs})
+    return json.loads(json.dumps([rng.sample(pool, rng.randint(1, 6)) for _ in range(n)]))
+
+
+def _allocated(build: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return after - before
+
+
+def _per_call_us(fn: Callable, requests: List[List[str]], repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for r in requests:
+            fn(r)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(requests) * 1e6
+
+
+def run_benchmark(n_requests: int = 10000, frame_requests: int = 500) -> List[Dict[str, Any]]:
+    requests = make_requests(n_requests)
+    features = sorted({canonical(s) for s in SYMPTOMS} | {"headache", "sneezing"})
+    fmap = FeatureMap(features)
+    frame_sample = requests[:frame_requests]
+
+    rows = [
+        {"measure": "memory: request sets (bytes/request)",
+         "old": _allocated(lambda: [list(r) for r in requests]) / n_requests,
+         "new": _allocated(lambda: [VOCAB.bits(r) for r in requests]) / n_requests,
+         "note": "list[str] containers (strings shared) vs. int bitset"},
+        {"measure": "memory: normalized sets (bytes/request)",
+         "old": _allocated(lambda: [_old_normalize(r) for r in requests]) / n_requests,
+         "new": _allocated(lambda: VOCAB.pack([VOCAB.bits(r) for r in requests])) / n_requests,
+         "note": "set[str] vs. packed uint8 batch array"},
+        {"measure": "heuristic_scores (us/request)",
+         "old": _per_call_us(_old_heuristic_scores, requests),
+         "new": _per_call_us(heuristic_scores, requests), "note": "mock server / cascade tier 1"},
+        {"measure": "urgency (us/request)",
+         "old": _per_call_us(_old_urgency_level, requests),
+         "new": _per_call_us(_new_urgency_level, requests), "note": "main.py rules"},
+        {"measure": "cache key (us/request)",
+         "old": _per_call_us(lambda r: tuple(sorted(_old_normalize(r))), requests),
+         "new": _per_call_us(VOCAB.bits, requests), "note": "sorted tuple vs. bitset"},
+        {"measure": "feature frame (us/request)",
+         "old": _per_call_us(lambda r: _old_input_frame(r, features), frame_sample),
+         "new": _per_call_us(lambda r: pd.DataFrame(fmap.matrix([VOCAB.bits(r)]), columns=features), frame_sample),
+         "note": f"{len(features)} model features"},
+    ]
+    for row in rows:
+        row["ratio"] = row["old"] / row["new"] if row["new"] else float("inf")
+    return rows
+
+
+def write_report(rows: List[Dict[str, Any]], out_dir: str = "outputs") -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"vocab_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    with open(stem + ".csv", "w", newline="", encoding="utf-8") as cf:
+        writer = csv.DictWriter(cf, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(stem + ".md", "w", encoding="utf-8") as mf:
+        mf.write(f"# Symptom sets: strings vs. bitsets — {datetime.now().isoformat()}\n\n")
+        mf.write("| measure | old | new | old/new | note |\n|---|---|---|---|---|\n")
+        for r in rows:
+            mf.write(f"| {r['measure']} | {r['old']:.2f} | {r['new']:.2f} | {r['ratio']:.1f}x | {r['note']} |\n")
+    return stem
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare string-set and bitset symptom representations")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--frame-requests", type=int, default=500, help="Requests for the (slow) DataFrame comparison")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.requests, args.frame_requests)
+    for r in rows:
+        print(f"{r['measure']:<42} old {r['old']:>10.2f}  new {r['new']:>10.2f}  ({r['ratio']:.1f}x)")
+    stem = write_report(rows)
+    print(f"Saved benchmark to {stem}.csv and {stem}.md")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+bulk_triage.py
+
+Bulk CSV triage for the Streamlit app: many patients in, one ZIP of PDFs out.
+
+1. `read_patients` parses the upload. It needs a `symptoms` column
+   (separated by ';', ',' or spaces) and optionally `patient_id` and
+   `description`.
+2. `triage` sends the rows to the API's /predict/batch endpoint in chunks of
+   `batch_size`, with at most `concurrency` requests in flight. A 503 is
+   retried after its Retry-After. Servers without a batch endpoint fall back
+   to one /predict call per row.
+3. `build_report_zip` renders one PDF per patient in a process pool. Each PDF
+   is written into a ZIP file on disk as soon as it is done. At most
+   2 x workers PDFs are in memory at a time.
+
+ZIPs go to a temp directory (`new_zip_path`), not `reports/`. Each new run
+deletes ZIPs older than `ZIP_MAX_AGE_S`. The download itself is not
+streamed: Streamlit's download button reads the whole finished ZIP into
+the server's memory.
+
+"""
+import csv
+import io
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Dict, List
+
+import requests
+
+from pdf_reports import generate_pdf_bytes
+from symptom_vocab import canonical
+
+MAX_RETRIES = 3
+ZIP_DIR = os.path.join(tempfile.gettempdir(), "mediscan_bulk_triage")
+ZIP_MAX_AGE_S = 3600
+
+
+def new_zip_path(directory: str = ZIP_DIR, max_age_s: float = ZIP_MAX_AGE_S) -> str:
+    """Unique path for a new bulk ZIP, after deleting ZIPs in `directory` older than `max_age_s`."""
+    os.makedirs(directory, exist_ok=True)
+    cutoff = time.time() - max_age_s
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if name.endswith(".zip") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # removed by another session meanwhile
+    fd, path = tempfile.mkstemp(prefix=f"bulk_triage_{time.strftime('%Y%m%d_%H%M%S')}_", suffix=".zip", dir=directory)
+    os.close(fd)
+    return path
+
+
+def read_patients(source) -> List[Dict[str, Any]]:
+    """Rows of a triage CSV as {"patient_id", "symptoms", "description"}."""
+    data = source.read() if hasattr(source, "read") else source
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    reader = csv.DictReader(io.StringIO(data))
+    fields = {(f or "").strip().lower(): f for f in reader.fieldnames or []}
+    if "symptoms" not in fields:
+        raise ValueError("CSV needs a 'symptoms' column")
+    id_field = fields.get("patient_id") or fields.get("id")
+    patients = []
+    for n, row in enumerate(reader, start=1):
+        symptoms = [canonical(s) for s in re.split(r"[;,]|\s+", row.get(fields["symptoms"]) or "") if s.strip()]
+        patient_id = (row.get(id_field) or "").strip() if id_field else ""
+        patients.append({
+            "patient_id": patient_id or str(n),
+            "symptoms": list(dict.fromkeys(symptoms)),
+            "description": (row.get(fields["description"]) or "").strip() if "description" in fields else "",
+        })
+    return patients
+
+
+def batch_url(api_url: str) -> str:
+    return api_url.rstrip("/") + "/batch"
+
+
+def _post(session, url: str, payload, timeout: float):
+    """POST with retries on 503, honouring Retry-After."""
+    for attempt in range(MAX_RETRIES + 1):
+        resp = session.post(url, json=payload, headers={"X-Request-Timeout": str(timeout)}, timeout=timeout)
+        if resp.status_code != 503 or attempt == MAX_RETRIES:
+            return resp
+        time.sleep(float(resp.headers.get("Retry-After", 1)))
+    return resp
+
+
+def _send_batch(session, api_url: str, batch: List[Dict[str, Any]], timeout: float) -> List[Dict[str, Any]]:
+    items = [{"symptoms": p["symptoms"], "description": p["description"]} for p in batch]
+    resp = _post(session, batch_url(api_url), {"items": items}, timeout)
+    if resp.status_code in (404, 405):
+        # server without /predict/batch: one request per row
+        results = []
+        for item in items:
+            r = _post(session, api_url, item, timeout)
+            results.append(r.json() if r.status_code < 400 else {"error": f"HTTP {r.status_code}: {r.text[:200]}"})
+        return results
+    if resp.status_code >= 400:
+        return [{"error": f"HTTP {resp.status_code}: {resp.text[:200]}"}] * len(items)
+    return resp.json()["results"]
+
+
+def triage(patients: List[Dict[str, Any]], api_url: str, batch_size: int = 25, concurrency: int = 4,
+           timeout: float = 30, progress: Callable[[int, int], None] | None = None,
+           session=None) -> List[Dict[str, Any]]:
+    """Score every patient; returns rows {**patient, "result", "error"} in input order."""
+    session = session or requests.Session()
+    batches = [patients[i:i + batch_size] for i in range(0, len(patients), batch_size)]
+    rows: List[Dict[str, Any] | None] = [None] * len(patients)
+    done = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(_send_batch, session, api_url, batch, timeout): b for b, batch in enumerate(batches)}
+        for fut in as_completed(futures):
+            b = futures[fut]
+            try:
+                results = fut.result()
+            except Exception as e:
+                results = [{"error": str(e)}] * len(batches[b])
+            for offset, (patient, result) in enumerate(zip(batches[b], results)):
+                error = result.get("error") if isinstance(result, dict) else None
+                rows[b * batch_size + offset] = {**patient, "result": None if error else result, "error": error}
+            done += len(batches[b])
+            if progress:
+                progress(done, len(patients))
+    return rows
+
+
+def _safe_name(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", text).strip("_")[:40] or "patient"
+
+
+def _render_pdf(index: int, row: Dict[str, Any]):
+    result = row["result"] or {}
+    pdf_bytes, _ = generate_pdf_bytes(row["symptoms"], result.get("predictions", []), result.get("urgency", {}))
+    return f"{index + 1:04d}_{_safe_name(row['patient_id'])}.pdf", pdf_bytes
+
+
+def _summary_csv(rows: List[Dict[str, Any]]) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["patient_id", "symptoms", "top_disease", "probability", "urgency", "error"])
+    for row in rows:
+        preds = (row["result"] or {}).get("predictions") or [{}]
+        writer.writerow([
+            row["patient_id"], ";".join(row["symptoms"]), preds[0].get("disease", ""),
+            f"{preds[0].get('probability', 0):.4f}" if preds[0] else "",
+            ((row["result"] or {}).get("urgency") or {}).get("level", ""), row["error"] or "",
+        ])
+    return out.getvalue()
+
+
+def build_report_zip(rows: List[Dict[str, Any]], zip_path: str, workers: int | None = None,
+                     progress: Callable[[int, int], None] | None = None) -> str:
+    """Render a PDF per successfully triaged row into `zip_path`, plus triage_summary.csv."""
+    workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+    todo = [(i, row) for i, row in enumerate(rows) if row["result"] is not None]
+    # spawn: workers only import pdf_reports, never the Streamlit script or its threads
+    ctx = multiprocessing.get_context("spawn")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        zf.writestr("triage_summary.csv", _summary_csv(rows))
+        pending, queued, done = set(), iter(todo), 0
+        while True:
+            while len(pending) < workers * 2:
+                nxt = next(queued, None)
+                if nxt is None:
+                    break
+                pending.add(pool.submit(_render_pdf, *nxt))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name, pdf_bytes = fut.result()
+                zf.writestr(name, pdf_bytes)
+                done += 1
+            if progress:
+                progress(done, len(todo))
+    return zip_path
@@ -0,0 +1,84 @@
+"""
+cascade.py
+
+Two-tier cascade for `main.py`'s /predict.
+
+Tier 1 is the cheap set-overlap scorer from `mock_predict_server.py`. When
+its best disease beats the runner-up by at least `margin` (on the raw
+matched-fraction score), the heuristic answer is returned as is. Ambiguous
+cases fall through to tier 2, the full XGBoost model.
+
+`CascadeStats` keeps in-memory counters for GET /cascade/stats:
+- tier hit counts and hit rates;
+- latency percentiles per tier;
+- agreement with model-only scoring. A sampled fraction of heuristic answers
+  is re-scored by the model after the response has been sent.
+
+"""
+import random
+from collections import deque
+from typing import Any, Dict, List
+
+from latency_stats import percentiles
+from mock_predict_server import heuristic_predictions, heuristic_scores
+
+TIERS = ("heuristic", "model")
+
+
+def heuristic_answer(symptoms: List[str], description: str, margin: float, min_score: float = 0.5):
+    """Score with the heuristic tier.
+
+    Returns (predictions, confident). Confident means the top raw score is at
+    least `min_score` and leads the runner-up by at least `margin`.
+    """
+    raw = heuristic_scores(symptoms, description)
+    ranked = sorted(raw.values(), reverse=True)
+    top = ranked[0] if ranked else 0.0
+    second = ranked[1] if len(ranked) > 1 else 0.0
+    confident = top >= min_score and (top - second) >= margin
+    return heuristic_predictions(raw), confident
+
+
+def _same_disease(a: str, b: str) -> bool:
+    return a.strip().lower() == b.strip().lower()
+
+
+class CascadeStats:
+    def __init__(self, verify_rate: float = 0.1, window: int = 10000):
+        self.verify_rate = verify_rate
+        self.hits = {tier: 0 for tier in TIERS}
+        self.latencies = {tier: deque(maxlen=window) for tier in TIERS}
+        self.agreement = {"checked": 0, "top1_agree": 0, "topk_overlap_sum": 0.0}
+
+    def record(self, tier: str, latency_ms: float):
+        self.hits[tier] += 1
+        self.latencies[tier].append(latency_ms)
+
+    def should_verify(self) -> bool:
+        return random.random() < self.verify_rate
+
+    def record_agreement(self, heuristic_preds, model_preds, k: int = 3):
+        """Compare a heuristic answer with what the model would have returned."""
+        if not heuristic_preds or not model_preds:
+            return
+        self.agreement["checked"] += 1
+        if _same_disease(heuristic_preds[0]["disease"], model_preds[0]["disease"]):
+            self.agreement["top1_agree"] += 1
+        h_top = {p["disease"].strip().lower() for p in heuristic_preds[:k]}
+        m_top = {p["disease"].strip().lower() for p in model_preds[:k]}
+        self.agreement["topk_overlap_sum"] += len(h_top & m_top) / k
+
+    def snapshot(self) -> Dict[str, Any]:
+        total = sum(self.hits.values())
+        checked = self.agreement["checked"]
+        return {
+            "requests": total,
+            "hit_rate": {tier: (n / total if total else 0.0) for tier, n in self.hits.items()},
+            "hits": dict(self.hits),
+            "latency_ms": {tier: percentiles(self.latencies[tier]) for tier in TIERS},
+            "agreement": {
+                "checked": checked,
+                "top1_rate": self.agreement["top1_agree"] / checked if checked else None,
+                "top3_overlap": self.agreement["topk_overlap_sum"] / checked if checked else None,
+            },
+        }
@@ -0,0 +1,201 @@
+"""
+compact_model.py
+
+Latency-aware compaction of the disease model trained by `train_disease_model.py`.
+
+Ranks the one-hot features by gain importance, retrains smaller candidates
+(fewer trees, shallower trees, top-N features only) and reports held-out
+accuracy against per-row and per-batch inference latency. The chosen candidate
+is retrained on the full dataset and saved with joblib, so `main.py` can serve
+it directly (it aligns request columns to `model.feature_names_in_`).
+
+Usage:
+    python compact_model.py --data dataset.csv
+    python compact_model.py --data dataset.csv --export disease_xgb_compact.pkl --max-accuracy-drop 0.01
+
+The encoder refit from --data is written to `<export>_encoder.pkl`, so the
+served `label_encoder.pkl` is never overwritten.
+
+"""
+import argparse
+import csv
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+
+from train_disease_model import (
+    DATASET_PATH,
+    DEFAULT_PARAMS,
+    build_features,
+    encoder_path_for,
+    holdout_split,
+    load_dataset,
+    save_model,
+    train_model,
+)
+
+TREE_COUNTS = (300, 150, 75, 30)
+DEPTHS = (8, 6, 4)
+FEATURE_FRACTIONS = (1.0, 0.5, 0.25)
+
+
+def rank_features(model) -> List[tuple]:
+    """Return [(feature, gain), ...] sorted by gain, including unused features (gain 0)."""
+    scores = model.get_booster().get_score(importance_type="gain")
+    ranked = [(f, float(scores.get(f, 0.0))) for f in model.feature_names_in_]
+    ranked.sort(key=lambda x: x[1], reverse=True)
+    return ranked
+
+
+def measure_latency(model, X, n_rows: int = 200, batch_size: int = 256, repeats: int = 5) -> Dict[str, float]:
+    """Time single-row predictions (as `/predict` does) and full-batch predictions.
+
+    Returns milliseconds: per-row p50/p99 and per-batch median, plus the
+    amortized per-row cost inside a batch.
+    """
+    n_rows = min(n_rows, len(X))
+    # warm up (first call pays for booster/DMatrix setup)
+    model.predict_proba(X.iloc[:1])
+
+    row_times = []
+    for i in range(n_rows):
+        row = X.iloc[[i]]
+        t0 = time.perf_counter()
+        model.predict_proba(row)
+        row_times.append((time.perf_counter() - t0) * 1000)
+
+    reps = int(np.ceil(batch_size / max(1, len(X))))
+    batch = X.iloc[np.tile(np.arange(len(X)), reps)[:batch_size]]
+    batch_times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        model.predict_proba(batch)
+        batch_times.append((time.perf_counter() - t0) * 1000)
+
+    batch_ms = float(np.median(batch_times))
+    return {
+        "row_p50_ms": float(np.percentile(row_times, 50)),
+        "row_p99_ms": float(np.percentile(row_times, 99)),
+        "batch_ms": batch_ms,
+        "batch_row_us": batch_ms * 1000 / len(batch),
+    }
+
+
+def candidate_grid(n_features: int, tree_counts=TREE_COUNTS, depths=DEPTHS, fractions=FEATURE_FRACTIONS) -> List[Dict[str, int]]:
+    grid = []
+    for n_est in tree_counts:
+        for depth in depths:
+            for frac in fractions:
+                grid.append({
+                    "n_estimators": n_est,
+                    "max_depth": depth,
+                    "n_features": max(1, int(round(n_features * frac))),
+                })
+    return grid
+
+
+def evaluate_candidates(X_train, y_train, X_test, y_test, num_class: int, ranking, candidates, batch_size: int = 256) -> List[Dict[str, Any]]:
+    results = []
+    for cand in candidates:
+        features = [f for f, _ in ranking[:cand["n_features"]]]
+        model = train_model(
+            X_train[features], y_train, num_class=num_class,
+            n_estimators=cand["n_estimators"], max_depth=cand["max_depth"],
+        )
+        X_eval = X_test[features] if len(X_test) else X_train[features]
+        y_eval = y_test if len(X_test) else y_train
+        accuracy = float(np.mean(model.predict(X_eval) == y_eval))
+        latency = measure_latency(model, X_eval, batch_size=batch_size)
+        results.append({**cand, "accuracy": accuracy, **latency})
+        print(f"  trees={cand['n_estimators']:>3} depth={cand['max_depth']} features={cand['n_features']:>3} "
+              f"acc={accuracy:.3f} row_p50={latency['row_p50_ms']:.2f}ms batch={latency['batch_ms']:.2f}ms")
+    return results
+
+
+def choose_candidate(results: List[Dict[str, Any]], max_accuracy_drop: float = 0.01) -> Dict[str, Any]:
+    """Fastest candidate (per-row p50) whose accuracy is within `max_accuracy_drop` of the best."""
+    best_acc = max(r["accuracy"] for r in results)
+    eligible = [r for r in results if r["accuracy"] >= best_acc - max_accuracy_drop]
+    return min(eligible, key=lambda r: (r["row_p50_ms"], r["batch_ms"]))
+
+
+def write_report(results: List[Dict[str, Any]], chosen: Dict[str, Any], out_dir: str = "outputs") -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"compaction_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    cols = ["n_estimators", "max_depth", "n_features", "accuracy", "row_p50_ms", "row_p99_ms", "batch_ms", "batch_row_us"]
+
+    with open(stem + ".csv", "w", newline="", encoding="utf-8") as cf:
+        writer = csv.DictWriter(cf, fieldnames=cols + ["chosen"])
+        writer.writeheader()
+        for r in results:
+            writer.writerow({**{c: r[c] for c in cols}, "chosen": r is chosen})
+
+    with open(stem + ".md", "w", encoding="utf-8") as mf:
+        mf.write(f"# Model Compaction — {datetime.now().isoformat()}\n\n")
+        mf.write("| trees | depth | features | accuracy | row p50 (ms) | row p99 (ms) | batch (ms) | batch/row (us) |\n")
+        mf.write("|---|---|---|---|---|---|---|---|\n")
+        for r in sorted(results, key=lambda r: r["row_p50_ms"]):
+            mark = " **(chosen)**" if r is chosen else ""
+            mf.write(f"| {r['n_estimators']} | {r['max_depth']} | {r['n_features']}{mark} | {r['accuracy']:.3f} | "
+                     f"{r['row_p50_ms']:.2f} | {r['row_p99_ms']:.2f} | {r['batch_ms']:.2f} | {r['batch_row_us']:.1f} |\n")
+    return stem
+
+
+def export_candidate(X, y_encoded, label_encoder, ranking, chosen: Dict[str, Any], model_path: str, encoder_path: str | None = None):
+    """Retrain the chosen configuration on all rows and save it for `main.py`."""
+    features = [f for f, _ in ranking[:chosen["n_features"]]]
+    model = train_model(
+        X[features], y_encoded, num_class=len(label_encoder.classes_),
+        n_estimators=chosen["n_estimators"], max_depth=chosen["max_depth"],
+    )
+    save_model(model, label_encoder, model_path, encoder_path or encoder_path_for(model_path))
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare compact model candidates by accuracy and latency")
+    parser.add_argument("--data", default=DATASET_PATH, help="Training CSV (must contain a 'Disease' column)")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                        help="Accept candidates at most this far below the best held-out accuracy")
+    parser.add_argument("--export", default="", help="Save the chosen model to this path (e.g. disease_xgb_compact.pkl)")
+    parser.add_argument("--encoder-out", default="",
+                        help="Label encoder path (default: <export>_encoder.pkl next to the model)")
+    args = parser.parse_args()
+
+    df = load_dataset(args.data)
+    X, y_encoded, label_encoder = build_features(df)
+    num_class = len(label_encoder.classes_)
+    X_train, X_test, y_train, y_test = holdout_split(X, y_encoded, test_size=args.test_size)
+
+    # Rank features with the current production configuration
+    reference = train_model(X_train, y_train, num_class=num_class, **DEFAULT_PARAMS)
+    ranking = rank_features(reference)
+    print("Top features by gain:")
+    for f, gain in ranking[:10]:
+        print(f"  {f}: {gain:.3f}")
+
+    print(f"Evaluating candidates on {len(X_test)} held-out rows...")
+    results = evaluate_candidates(
+        X_train, y_train, X_test, y_test, num_class, ranking,
+        candidate_grid(len(ranking)), batch_size=args.batch_size,
+    )
+    chosen = choose_candidate(results, args.max_accuracy_drop)
+    stem = write_report(results, chosen)
+    print(f"Saved compaction table to {stem}.csv and {stem}.md")
+    print(f"Chosen: trees={chosen['n_estimators']} depth={chosen['max_depth']} features={chosen['n_features']} "
+          f"(accuracy {chosen['accuracy']:.3f}, row p50 {chosen['row_p50_ms']:.2f}ms)")
+
+    if args.export:
+        encoder_out = args.encoder_out or encoder_path_for(args.export)
+        export_candidate(X, y_encoded, label_encoder, ranking, chosen, args.export, encoder_out)
+        print(f"Exported compact model to {args.export} and encoder to {encoder_out} "
+              f"(serve with MODEL_PATH={args.export} ENCODER_PATH={encoder_out})")
+
+
+if __name__ == "__main__":
+    main()
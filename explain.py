@@ -0,0 +1,143 @@
+"""
+explain.py
+
+Per-symptom contribution explanations for the /explain endpoint in `main.py`.
+
+Contributions come from XGBoost's native tree SHAP (`pred_contribs=True`).
+Values are in margin (log-odds) space: for each disease, bias plus all
+feature contributions equals the model's raw score for that disease.
+
+That computation is much heavier than `predict_proba`, so `ContributionExplainer`:
+- memoizes results in an LRU cache keyed on the canonical symptom set
+  (sorted, normalized), top_k and the model version;
+- joins identical requests that are already in flight;
+- batches concurrent requests for a few milliseconds into one DMatrix call;
+- runs the work on a small dedicated thread pool, using its own copy of the
+  booster with a limited thread count, so /predict stays responsive.
+
+"""
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import xgboost as xgb
+
+from symptom_vocab import canonical, canonical_set
+
+
+def tree_contributions(booster: xgb.Booster, frame, class_labels: List[str], symptom_sets: List[tuple], top_k: int = 3) -> List[Dict[str, Any]]:
+    """Explain each row of `frame` (one per symptom set) for its top_k diseases."""
+    dmat = xgb.DMatrix(frame)
+    probs = booster.predict(dmat)
+    contribs = booster.predict(dmat, pred_contribs=True)
+    if contribs.ndim == 2:  # single-output models return (rows, features + 1)
+        contribs = contribs[:, None, :]
+        probs = probs.reshape(len(frame), -1)
+    features = list(frame.columns)
+    feature_index = {canonical(f): i for i, f in enumerate(features)}
+
+    results = []
+    for row, symptoms in enumerate(symptom_sets):
+        present = [s for s in symptoms if s in feature_index]
+        unknown = [s for s in symptoms if s not in feature_index]
+        explanations = []
+        for cls in np.argsort(probs[row])[::-1][:top_k]:
+            values = contribs[row, cls]
+            symptom_contribs = sorted(
+                ({"symptom": s, "contribution": float(values[feature_index[s]])} for s in present),
+                key=lambda x: abs(x["contribution"]),
+                reverse=True,
+            )
+            explained = sum(c["contribution"] for c in symptom_contribs)
+            explanations.append({
+                "disease": str(class_labels[cls]) if cls < len(class_labels) else str(cls),
+                "probability": float(probs[row, cls]),
+                "bias": float(values[-1]),
+                "contributions": symptom_contribs,
+                # absent features still move the score (e.g. "no fever")
+                "other_features": float(values[:-1].sum() - explained),
+            })
+        results.append({"explanations": explanations, "unknown_symptoms": unknown})
+    return results
+
+
+class ContributionExplainer:
+    def __init__(self, compute_fn: Callable, workers: int = 2, max_batch: int = 32,
+                 batch_window_ms: float = 5.0, cache_size: int = 1024):
+        """`compute_fn(symptom_sets, top_k, context)` returns one result per canonical symptom set.
+
+        `context` is passed through from `explain()` (e.g. the selected model);
+        requests are only batched with others for the same top_k and model version.
+        """
+        self.compute_fn = compute_fn
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000
+        self.cache_size = cache_size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="explain")
+        self._cache: OrderedDict = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._pending: Dict[tuple, List[tuple]] = {}
+        self._contexts: Dict[tuple, Any] = {}
+        self._timers: Dict[tuple, asyncio.TimerHandle] = {}
+        self.counters = {"requests": 0, "cache_hits": 0, "joined_inflight": 0, "batches": 0, "computed": 0}
+
+    async def explain(self, symptoms: List[str], top_k: int, model_version: str | None, context: Any = None):
+        self.counters["requests"] += 1
+        canon = canonical_set(symptoms)
+        key = (canon, top_k, model_version)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            return self._cache[key]
+        if key in self._inflight:
+            self.counters["joined_inflight"] += 1
+            return await asyncio.shield(self._inflight[key])
+
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._inflight[key] = fut
+        bucket = (top_k, model_version)
+        self._contexts[bucket] = context
+        self._pending.setdefault(bucket, []).append((key, canon, fut))
+        if len(self._pending[bucket]) >= self.max_batch:
+            self._flush(bucket)
+        elif bucket not in self._timers:
+            self._timers[bucket] = loop.call_later(self.batch_window, self._flush, bucket)
+        return await asyncio.shield(fut)
+
+    def _flush(self, bucket: tuple):
+        timer = self._timers.pop(bucket, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(bucket, [])
+        context = self._contexts.pop(bucket, None)
+        if not batch:
+            return
+        self.counters["batches"] += 1
+        loop = asyncio.get_running_loop()
+        work = loop.run_in_executor(self._pool, self.compute_fn, [canon for _, canon, _ in batch], bucket[0], context)
+        work.add_done_callback(lambda done: self._resolve(batch, done))
+
+    def _resolve(self, batch, done: asyncio.Future):
+        error = done.exception()
+        results = None if error else done.result()
+        for i, (key, _, fut) in enumerate(batch):
+            self._inflight.pop(key, None)
+            if fut.done():
+                continue
+            if error:
+                fut.set_exception(error)
+                continue
+            self.counters["computed"] += 1
+            self._cache[key] = results[i]
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            fut.set_result(results[i])
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "cached": len(self._cache), "inflight": len(self._inflight)}
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
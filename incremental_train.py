@@ -0,0 +1,242 @@
+"""
+incremental_train.py
+
+Continue training the existing `disease_xgb.pkl` booster on newly labelled rows
+(e.g. confirmed diagnoses exported from logged predictions) instead of
+rebuilding from the full CSV.
+
+- New symptom columns: the booster is widened with the extra features appended
+  after the existing ones. Old trees keep their feature indices, so their
+  predictions do not change, and new trees can split on the new columns.
+- New disease classes: they are appended to the label encoder, so existing
+  class ids never move. A softmax booster cannot grow extra outputs
+  incrementally, so this case falls back to a full rebuild on `--base-data`
+  plus the new rows (and refuses to run without `--base-data`).
+
+Usage:
+    python incremental_train.py --new-data confirmed_2025-11-20.csv --rounds 50
+    python incremental_train.py --new-data batch.csv --base-data dataset.csv --benchmark
+
+"""
+import argparse
+import copy
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from xgboost import XGBClassifier
+
+from train_disease_model import (
+    ENCODER_PATH,
+    MODEL_PATH,
+    build_features,
+    load_dataset,
+    save_model,
+    train_model,
+)
+
+DEFAULT_ROUNDS = 50
+
+
+def extend_label_encoder(label_encoder, labels) -> tuple:
+    """Return (encoder, new_classes) with unseen labels appended after the existing classes.
+
+    The original encoder is not modified. Classes are stored as an object array so
+    `transform` maps by value rather than relying on sorted order.
+    """
+    known = list(label_encoder.classes_)
+    new_classes = sorted({str(x) for x in labels} - {str(x) for x in known})
+    if not new_classes:
+        return label_encoder, []
+    encoder = copy.deepcopy(label_encoder)
+    encoder.classes_ = np.array(known + new_classes, dtype=object)
+    return encoder, new_classes
+
+
+def align_features(X_new: pd.DataFrame, feature_names: List[str], feature_types: List[str] | None = None) -> tuple:
+    """Order X_new like the model's features (missing ones = 0) and append unseen columns.
+
+    `feature_types` are the booster's types; indicator ("i") columns are kept
+    boolean so the DMatrix matches what the booster was trained on.
+    """
+    new_cols = [c for c in X_new.columns if c not in set(feature_names)]
+    aligned = X_new.reindex(columns=list(feature_names) + new_cols, fill_value=0)
+    for col, ftype in zip(feature_names, feature_types or []):
+        if ftype == "i":
+            aligned[col] = aligned[col].astype(bool)
+    return aligned, new_cols
+
+
+def widen_booster(booster: xgb.Booster, new_columns: pd.DataFrame) -> xgb.Booster:
+    """Return a copy of `booster` that accepts the extra feature columns in `new_columns`."""
+    config = json.loads(booster.save_raw("json"))
+    learner = config["learner"]
+    new_types = xgb.DMatrix(new_columns).feature_types
+    learner["feature_names"] = list(learner["feature_names"]) + list(new_columns.columns)
+    learner["feature_types"] = list(learner["feature_types"]) + list(new_types)
+    num_feature = str(len(learner["feature_names"]))
+    learner["learner_model_param"]["num_feature"] = num_feature
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        tree["tree_param"]["num_feature"] = num_feature
+    widened = xgb.Booster()
+    widened.load_model(bytearray(json.dumps(config).encode("utf-8")))
+    return widened
+
+
+def continue_training(model: XGBClassifier, X: pd.DataFrame, y, rounds: int = DEFAULT_ROUNDS) -> XGBClassifier:
+    """Add `rounds` boosting rounds to `model` using only (X, y).
+
+    Uses `xgb.train` rather than `XGBClassifier.fit`, because `fit` requires every
+    class to appear in y and a daily batch rarely covers all diseases.
+    """
+    booster = model.get_booster()
+    new_cols = [c for c in X.columns if c not in set(booster.feature_names or [])]
+    if new_cols:
+        booster = widen_booster(booster, X[new_cols])
+
+    params = {k: v for k, v in model.get_xgb_params().items() if v is not None}
+    dtrain = xgb.DMatrix(X, label=np.asarray(y))
+    booster = xgb.train(params, dtrain, num_boost_round=rounds, xgb_model=booster)
+
+    updated = XGBClassifier()
+    updated.load_model(booster.save_raw("ubj"))
+    updated.set_params(**{k: v for k, v in model.get_params().items() if v is not None})
+    return updated
+
+
+def incremental_update(model, label_encoder, df_new: pd.DataFrame, rounds: int = DEFAULT_ROUNDS,
+                       base_df: pd.DataFrame | None = None) -> tuple:
+    """Update (model, label_encoder) with the labelled rows in df_new.
+
+    Returns (model, label_encoder, info), where info records the mode used
+    ("incremental" or "rebuild"), new features/classes and elapsed seconds.
+    """
+    t0 = time.perf_counter()
+    encoder, new_classes = extend_label_encoder(label_encoder, df_new["Disease"].astype(str))
+
+    if new_classes:
+        if base_df is None:
+            raise ValueError(
+                f"New disease classes {new_classes} need a full rebuild; pass the base dataset (--base-data)"
+            )
+        combined = pd.concat([base_df, df_new], ignore_index=True)
+        X, y, encoder = build_features(combined, encoder)
+        # keep every tuned hyperparameter; train_model sets objective/num_class itself
+        params = {k: v for k, v in model.get_params().items()
+                  if v is not None and k not in ("num_class", "n_jobs", "objective")}
+        updated = train_model(X, y, num_class=len(encoder.classes_), **params)
+        mode, new_features = "rebuild", [c for c in X.columns if c not in set(model.feature_names_in_)]
+    else:
+        X_new, y_new, _ = build_features(df_new, encoder)
+        booster = model.get_booster()
+        X_new, new_features = align_features(X_new, list(booster.feature_names), booster.feature_types)
+        updated = continue_training(model, X_new, y_new, rounds)
+        mode = "incremental"
+
+    info = {
+        "mode": mode,
+        "rows": len(df_new),
+        "new_features": new_features,
+        "new_classes": new_classes,
+        "seconds": time.perf_counter() - t0,
+    }
+    return updated, encoder, info
+
+
+def benchmark_scaling(base_df: pd.DataFrame, new_df: pd.DataFrame, steps: int = 5, rounds: int = DEFAULT_ROUNDS) -> List[Dict[str, Any]]:
+    """Compare a full rebuild with an incremental update as the data grows.
+
+    `new_df` is split into `steps` daily-style batches. At step k the full
+    rebuild trains on base + batches[:k], while the incremental path only
+    trains on batch k on top of the previous model.
+    """
+    batches = [new_df.iloc[idx] for idx in np.array_split(np.arange(len(new_df)), steps) if len(idx)]
+    X, y, encoder = build_features(base_df)
+    model = train_model(X, y, num_class=len(encoder.classes_))
+
+    rows, seen = [], [base_df]
+    for k, batch in enumerate(batches, 1):
+        seen.append(batch)
+        combined = pd.concat(seen, ignore_index=True)
+
+        t0 = time.perf_counter()
+        Xf, yf, enc_full = build_features(combined, extend_label_encoder(encoder, combined["Disease"].astype(str))[0])
+        train_model(Xf, yf, num_class=len(enc_full.classes_))
+        full_s = time.perf_counter() - t0
+
+        model, encoder, info = incremental_update(model, encoder, batch, rounds=rounds, base_df=combined.iloc[:-len(batch)])
+        rows.append({
+            "step": k,
+            "total_rows": len(combined),
+            "batch_rows": len(batch),
+            "full_rebuild_s": full_s,
+            "incremental_s": info["seconds"],
+            "mode": info["mode"],
+            "speedup": full_s / info["seconds"] if info["seconds"] else float("inf"),
+        })
+        print(f"  step {k}: {len(combined)} rows  full={full_s:.2f}s  incremental={info['seconds']:.2f}s ({info['mode']})")
+    return rows
+
+
+def write_benchmark(rows: List[Dict[str, Any]], out_dir: str = "outputs") -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"incremental_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    with open(stem + ".csv", "w", newline="", encoding="utf-8") as cf:
+        writer = csv.DictWriter(cf, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(stem + ".md", "w", encoding="utf-8") as mf:
+        mf.write(f"# Incremental vs. Full Retrain — {datetime.now().isoformat()}\n\n")
+        mf.write("| step | total rows | batch rows | full rebuild (s) | incremental (s) | mode | speedup |\n")
+        mf.write("|---|---|---|---|---|---|---|\n")
+        for r in rows:
+            mf.write(f"| {r['step']} | {r['total_rows']} | {r['batch_rows']} | {r['full_rebuild_s']:.2f} | "
+                     f"{r['incremental_s']:.2f} | {r['mode']} | {r['speedup']:.1f}x |\n")
+    return stem
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continue training the disease model on newly labelled rows")
+    parser.add_argument("--new-data", required=True, help="CSV of confirmed diagnoses (same columns as training data)")
+    parser.add_argument("--base-data", default="", help="Full training CSV (needed when new diseases appear)")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--encoder", default=ENCODER_PATH)
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Boosting rounds to add")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Report full rebuild vs. incremental time as data grows (needs --base-data)")
+    parser.add_argument("--steps", type=int, default=5)
+    args = parser.parse_args()
+
+    new_df = load_dataset(args.new_data)
+    base_df = load_dataset(args.base_data) if args.base_data else None
+
+    if args.benchmark:
+        if base_df is None:
+            parser.error("--benchmark requires --base-data")
+        rows = benchmark_scaling(base_df, new_df, steps=args.steps, rounds=args.rounds)
+        stem = write_benchmark(rows)
+        print(f"Saved timing table to {stem}.csv and {stem}.md")
+        return
+
+    model = joblib.load(args.model)
+    label_encoder = joblib.load(args.encoder)
+    model, label_encoder, info = incremental_update(model, label_encoder, new_df, rounds=args.rounds, base_df=base_df)
+    save_model(model, label_encoder, args.model, args.encoder)
+
+    print(f"Model updated ({info['mode']}) with {info['rows']} rows in {info['seconds']:.2f}s")
+    if info["new_features"]:
+        print(f"New features: {info['new_features']}")
+    if info["new_classes"]:
+        print(f"New classes: {info['new_classes']}")
+    print(f"Number of classes: {len(label_encoder.classes_)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+latency_stats.py
+
+Percentile summaries shared by the in-memory stats endpoints
+(/cascade/stats, /shadow/stats, /admission/stats).
+
+"""
+from typing import Dict
+
+import numpy as np
+
+
+def percentiles(values) -> Dict[str, float | None]:
+    """count / p50 / p95 / p99 of `values` (any iterable of numbers), rounded to 3 places."""
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "p99": None}
+    arr = np.fromiter(values, dtype=float)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {"count": len(arr), "p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3)}
@@ -0,0 +1,113 @@
+"""
+live_predict.py
+
+Debounced predict-as-you-type for `streamlit_app.py`.
+
+`LivePredictor` lives in `st.session_state`. The live-suggestions fragment
+calls `update()` with the current inputs, then `tick()` to find out what to
+render. It keeps backend load bounded:
+- a request is sent only once the inputs have been stable for `debounce_s`;
+- one worker thread, so at most one request is in flight per session. An
+  older request that has not started is cancelled when the inputs change. One
+  that is already running is left to finish, but its result is only cached,
+  never shown for the newer inputs;
+- results are cached per canonical symptom set / description, so toggling a
+  symptom back is instant;
+- while a request for a one-symptom edit is pending, the previous ranking
+  stays on screen marked stale instead of blanking the panel.
+
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from symptom_vocab import canonical_set
+
+
+def canonical_key(symptoms: List[str], description: str = "") -> tuple:
+    return canonical_set(symptoms), " ".join(str(description or "").lower().split())
+
+
+def _one_symptom_apart(a: tuple, b: tuple) -> bool:
+    return len(set(a[0]) ^ set(b[0])) <= 1
+
+
+class LivePredictor:
+    def __init__(self, predict_fn: Callable, debounce_s: float = 0.6, cache_size: int = 64):
+        """`predict_fn(symptoms, description)` returns (result, error) like `predict_cached`."""
+        self.predict_fn = predict_fn
+        self.debounce_s = debounce_s
+        self.cache_size = cache_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-predict")
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.wanted: tuple | None = None
+        self.changed_at = 0.0
+        self._future: Future | None = None
+        self._future_key: tuple | None = None
+        self.shown: tuple | None = None  # (key, result, error) last displayed
+        self.counters = {"submitted": 0, "cancelled": 0, "superseded": 0, "cache_hits": 0}
+
+    def update(self, symptoms: List[str], description: str = "", now: float | None = None):
+        key = canonical_key(symptoms, description)
+        if key == self.wanted:
+            return
+        self.wanted = key
+        self.changed_at = time.monotonic() if now is None else now
+        if self._future is not None and self._future_key != key:
+            if self._future.cancel():
+                self.counters["cancelled"] += 1
+            else:
+                self.counters["superseded"] += 1
+            self._future = self._future_key = None
+
+    def _run(self, key: tuple):
+        result, err = self.predict_fn(list(key[0]), key[1])
+        if not err:
+            with self._lock:
+                self._cache[key] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result, err
+
+    def tick(self, now: float | None = None) -> Dict[str, Any]:
+        """Advance the state machine; returns {"status", "result", "error", "stale"} to render.
+
+        status is one of idle, waiting (debouncing), loading, ready or error.
+        """
+        now = time.monotonic() if now is None else now
+        key = self.wanted
+        if key is None or not key[0]:
+            return {"status": "idle", "result": None, "error": None, "stale": False}
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            if self.shown is None or self.shown[0] != key:
+                self.counters["cache_hits"] += 1
+            self.shown = (key, cached, None)
+            return {"status": "ready", "result": cached, "error": None, "stale": False}
+
+        if self._future is not None and self._future.done():
+            result, err = self._future.result()
+            self._future = self._future_key = None
+            self.shown = (key, result, err)
+        if self.shown is not None and self.shown[0] == key and self.shown[2]:
+            return {"status": "error", "result": None, "error": self.shown[2], "stale": False}
+
+        if self._future is None and now - self.changed_at >= self.debounce_s:
+            self._future = self._executor.submit(self._run, key)
+            self._future_key = key
+            self.counters["submitted"] += 1
+
+        status = "loading" if self._future is not None else "waiting"
+        if self.shown is not None and self.shown[1] and _one_symptom_apart(self.shown[0], key):
+            return {"status": status, "result": self.shown[1], "error": None, "stale": True}
+        return {"status": status, "result": None, "error": None, "stale": False}
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,132 +1,590 @@
 # In main.py
-from fastapi import FastAPI, HTTPException, Request
+import asyncio
+import os
+import time
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 import joblib
+import numpy as np
 import pandas as pd
 
-app = FastAPI()
+from admission import AdmissionController, Rejected, parse_deadline
+from answer_table import ensure_table
+from audit_log import AuditSink
+from cascade import CascadeStats, heuristic_answer
+from explain import ContributionExplainer, tree_contributions
+from mock_predict_server import heuristic_predictions, heuristic_scores, heuristic_urgency
+from model_registry import ModelNotFound, ModelRegistry, estimate_model_bytes, file_version
+from shadow import ShadowScorer
+from symptom_vocab import VOCAB, FeatureMap
+from profiling import ProfilerControl, ProfilingMiddleware, add_profiling_routes
+
+# Model paths (override to serve e.g. a compacted model from compact_model.py)
+MODEL_PATH = os.environ.get("MODEL_PATH", "disease_xgb.pkl")
+ENCODER_PATH = os.environ.get("ENCODER_PATH", "label_encoder.pkl")
+
+# Extra named/versioned models, loaded on first use (see model_registry.py).
+# MODEL_MEMORY_BUDGET_MB overrides the budget from the registry file.
+MODEL_REGISTRY = os.environ.get("MODEL_REGISTRY", os.path.join("models", "registry.json"))
+MODEL_MEMORY_BUDGET_MB = os.environ.get("MODEL_MEMORY_BUDGET_MB")
+
+# Audit trail of every /predict decision (set AUDIT_LOG_DIR="" to disable)
+AUDIT_LOG_DIR = os.environ.get("AUDIT_LOG_DIR", os.path.join("logs", "audit"))
+
+# Admission control for model inference: concurrent slots, queue length, and the
+# deadline applied when a request sends no X-Request-Timeout / X-Request-Deadline
+MAX_INFLIGHT = int(os.environ.get("MAX_INFLIGHT", "4"))
+MAX_QUEUE = int(os.environ.get("MAX_QUEUE", "32"))
+DEFAULT_REQUEST_TIMEOUT = float(os.environ.get("DEFAULT_REQUEST_TIMEOUT", "0")) or None
+# Largest accepted /predict/batch body
+MAX_BATCH_ITEMS = int(os.environ.get("MAX_BATCH_ITEMS", "100"))
+
+# Precomputed answers for frequent symptom sets (see precompute_table.py; "" disables)
+ANSWER_TABLE_DIR = os.environ.get("ANSWER_TABLE_DIR", "precomputed")
+
+# Prediction mode: "model" (always XGBoost) or "cascade" (heuristic first, model when ambiguous).
+# A request can override it with {"mode": "..."}.
+PREDICT_MODE = os.environ.get("PREDICT_MODE", "model")
+CASCADE_MARGIN = float(os.environ.get("CASCADE_MARGIN", "0.25"))
+CASCADE_VERIFY_RATE = float(os.environ.get("CASCADE_VERIFY_RATE", "0.1"))
+
+# Optional shadow model scored off the request path: a model path, or "heuristic"
+SHADOW_MODEL_PATH = os.environ.get("SHADOW_MODEL_PATH", "")
+SHADOW_ENCODER_PATH = os.environ.get("SHADOW_ENCODER_PATH", ENCODER_PATH)
+SHADOW_SAMPLE_RATE = float(os.environ.get("SHADOW_SAMPLE_RATE", "0.1"))
+
+# /explain runs on its own small pool so /predict is not slowed down
+EXPLAIN_WORKERS = int(os.environ.get("EXPLAIN_WORKERS", "2"))
+EXPLAIN_THREADS = int(os.environ.get("EXPLAIN_THREADS", "1"))
 
-# Model paths
-MODEL_PATH = "disease_xgb.pkl"
-ENCODER_PATH = "label_encoder.pkl"
 
 # Load models
 print("🔍 Loading models...")
 try:
     model = joblib.load(MODEL_PATH)
     label_encoder = joblib.load(ENCODER_PATH)
+    model_version = file_version(MODEL_PATH)
     print("✅ Models loaded successfully!")
     print(f"Model features: {model.feature_names_in_}")
 except Exception as e:
     print(f"❌ Error loading models: {e}")
     model = None
     label_encoder = None
+    model_version = None
+
+registry = ModelRegistry.from_config(
+    MODEL_REGISTRY, float(MODEL_MEMORY_BUDGET_MB) if MODEL_MEMORY_BUDGET_MB else None,
+)
+if model is not None:
+    # the default model is always resident; it counts toward the budget but is never evicted
+    registry.pinned_bytes = estimate_model_bytes(model, ENCODER_PATH)
+if registry.names():
+    print(f"📚 Model registry: {', '.join(registry.names())}")
+default_requests = 0
+
+audit_sink = AuditSink(AUDIT_LOG_DIR) if AUDIT_LOG_DIR else None
+cascade_stats = CascadeStats(verify_rate=CASCADE_VERIFY_RATE)
+admission = AdmissionController(max_inflight=MAX_INFLIGHT, max_queue=MAX_QUEUE)
+answer_table = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if audit_sink is not None:
+        await audit_sink.start()
+    if ANSWER_TABLE_DIR and model is not None:
+        # may rebuild for a new model version; requests use the model meanwhile
+        asyncio.get_running_loop().run_in_executor(None, _load_answer_table)
+    yield
+    if audit_sink is not None:
+        # flush buffered audit records before the process exits
+        await audit_sink.stop()
+    explainer.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Opt-in sampling profiler (PROFILE_SAMPLE_RATE or POST /debug/profiling)
+profiler = ProfilerControl.from_env()
+app.add_middleware(ProfilingMiddleware, control=profiler)
+add_profiling_routes(app, profiler)
+
 
 @app.get("/health")
 async def health_check():
     return {
         "status": "ok" if model is not None else "error",
-        "model_loaded": model is not None
+        "model_loaded": model is not None,
+        "model_version": model_version,
+        "models": {
+            "default": {
+                "loaded": model is not None,
+                "model_version": model_version,
+                "memory_bytes_estimate": registry.pinned_bytes,
+                "requests": default_requests,
+            },
+            **registry.stats()["models"],
+        },
+        "memory": {k: v for k, v in registry.stats().items() if k != "models"},
+        "admission": admission.stats(),
+        "answer_table": answer_table.stats() if answer_table is not None else None,
+        "audit": audit_sink.stats() if audit_sink is not None else None,
     }
 
-@app.post("/predict")
-async def predict(request: Request):
-    try:
-        # Ensure model is loaded
+
+def _parse_payload(data):
+    """Extract (symptoms, description) from a list or {"symptoms", "description"} payload."""
+    if isinstance(data, list):
+        symptoms = data
+        description = ""
+    elif isinstance(data, dict):
+        symptoms = data.get("symptoms", [])
+        description = data.get("description", "")
+    else:
+        symptoms = []
+        description = ""
+    # ensure symptoms are strings
+    symptoms = [str(s).strip() for s in symptoms if s]
+    return symptoms, description or ""
+
+
+def _request_mode(data) -> str:
+    mode = data.get("mode") if isinstance(data, dict) else None
+    mode = mode or PREDICT_MODE
+    if mode not in ("model", "cascade"):
+        raise HTTPException(status_code=400, detail=f"Unknown mode '{mode}' (expected 'model' or 'cascade')")
+    return mode
+
+
+async def _select_model(data):
+    """Resolve the request's {"model": "name" | "name@version"} to (model, encoder, version, key).
+
+    Without a "model" field the default MODEL_PATH model is used. Registry
+    models are loaded lazily, in the threadpool, on their first request.
+    """
+    global default_requests
+    name = data.get("model") if isinstance(data, dict) else None
+    if not name or name == "default":
         if model is None:
             raise HTTPException(status_code=503, detail="Model not loaded")
+        default_requests += 1
+        return model, label_encoder, model_version, "default"
+    name, _, version = str(name).partition("@")
+    try:
+        entry = registry.resolve(name, version or None)
+    except ModelNotFound:
+        raise HTTPException(status_code=404, detail=f"Unknown model '{data['model']}'")
+    try:
+        # references taken under the entry lock: an eviction right after can't swap in the default model
+        mdl, encoder, mversion = await run_in_threadpool(registry.get, entry.name, entry.version)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Model '{data['model']}' failed to load: {e}")
+    return mdl, encoder, mversion, entry.key
+
+
+# Per-model bitset -> feature-matrix maps (weak keys: dropped with evicted models)
+_feature_maps = weakref.WeakKeyDictionary()
+
+
+def _feature_map(mdl) -> FeatureMap:
+    fmap = _feature_maps.get(mdl)
+    if fmap is None:
+        fmap = _feature_maps[mdl] = FeatureMap(mdl.feature_names_in_)
+    return fmap
+
+
+# Helpers default to the MODEL_PATH model only when no model is passed at all.
+# An explicit None (e.g. an unloaded registry model) is an error, never a fallback.
+_DEFAULT = object()
+
+
+def _resolve_model(mdl=_DEFAULT, encoder=_DEFAULT):
+    if mdl is _DEFAULT:
+        mdl, encoder = model, (label_encoder if encoder is _DEFAULT else encoder)
+    elif encoder is _DEFAULT:
+        encoder = None
+    if mdl is None:
+        raise RuntimeError("No model to predict with (not loaded, or unloaded from the registry)")
+    return mdl, encoder
+
+
+def _build_input_frame(symptoms, mdl=_DEFAULT):
+    mdl, _ = _resolve_model(mdl)
+    if hasattr(mdl, "feature_names_in_"):
+        return _build_batch_frame([symptoms], mdl)
+    # models without feature names get the request's symptoms as columns
+    return pd.DataFrame([{symptom: 1 for symptom in symptoms}])
+
+
+def _class_labels(n_probs: int, mdl=_DEFAULT, encoder=_DEFAULT):
+    """Determine class labels safely.
+
+    The label encoder comes first: XGBoost's `classes_` are the encoded integers,
+    which would surface as "0", "1", ... instead of disease names.
+    """
+    mdl, encoder = _resolve_model(mdl, encoder)
+    if encoder is not None and hasattr(encoder, "classes_") and len(encoder.classes_) == n_probs:
+        return list(encoder.classes_)
+    if hasattr(mdl, "classes_") and len(getattr(mdl, "classes_", [])) == n_probs:
+        return list(mdl.classes_)
+    return [str(i) for i in range(n_probs)]
+
+
+def _model_predictions(symptoms, top_k: int = 10, mdl=_DEFAULT, encoder=_DEFAULT):
+    mdl, encoder = _resolve_model(mdl, encoder)
+    input_df = _build_input_frame(symptoms, mdl)
+
+    # Get predictions (handle model errors cleanly)
+    try:
+        probs = mdl.predict_proba(input_df)[0]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model prediction failed: {e}")
+
+    class_labels = _class_labels(len(probs), mdl, encoder)
+
+    # Build sorted predictions (highest first)
+    idx_sorted = np.argsort(probs)[::-1]
+    predictions = []
+    for i in idx_sorted[:top_k]:
+        label = class_labels[i] if i < len(class_labels) else str(i)
+        predictions.append({
+            "disease": str(label),
+            "probability": float(probs[i]),
+        })
+    return predictions
+
+
+def _batch_model_predictions(symptom_sets, top_k: int = 10, mdl=_DEFAULT, encoder=_DEFAULT):
+    """Score many symptom sets with one predict_proba call."""
+    mdl, encoder = _resolve_model(mdl, encoder)
+    probs = mdl.predict_proba(_build_batch_frame(symptom_sets, mdl))
+    class_labels = _class_labels(probs.shape[1], mdl, encoder)
+    results = []
+    for row in probs:
+        results.append([
+            {"disease": str(class_labels[i]), "probability": float(row[i])}
+            for i in np.argsort(row)[::-1][:top_k]
+        ])
+    return results
+
+
+def _build_batch_frame(symptom_sets, mdl=_DEFAULT):
+    """One 0/1 row per symptom set, in the model's feature order.
+
+    Symptoms and feature names are matched by canonical name, so "Chest Pain"
+    hits a `chest_pain` feature.
+    """
+    mdl, _ = _resolve_model(mdl)
+    fmap = _feature_map(mdl)
+    return pd.DataFrame(fmap.matrix([VOCAB.bits(s) for s in symptom_sets]), columns=fmap.feature_names)
+
+
+# Per-model booster copies for /explain, with their own thread limit.
+# Weak keys: a copy goes away when its model is evicted from the registry.
+_explain_boosters = weakref.WeakKeyDictionary()
+
+
+def _explain_batch(symptom_sets, top_k: int, selected=None):
+    mdl, encoder = _resolve_model(*selected) if selected is not None else _resolve_model()
+    if mdl not in _explain_boosters:
+        booster = mdl.get_booster().copy()
+        booster.set_param({"nthread": EXPLAIN_THREADS})
+        _explain_boosters[mdl] = booster
+    frame = _build_batch_frame(symptom_sets, mdl)
+    labels = _class_labels(int(mdl.n_classes_), mdl, encoder)
+    return tree_contributions(_explain_boosters[mdl], frame, labels, symptom_sets, top_k)
+
+
+explainer = ContributionExplainer(_explain_batch, workers=EXPLAIN_WORKERS)
+
+
+_LOW_SYMPTOMS = VOCAB.mask(["fever", "cough", "fatigue"])
+_HIGH_FLAGS = VOCAB.mask(["chest_pain", "shortness_of_breath", "severe_breathing"])
+
+
+def _urgency(symptoms, description: str):
+    # Map urgency based on simple heuristics (keeps compatibility with front-end)
+    urgency = {"level": "low", "recommendation": "Monitor your symptoms and follow up if they worsen."}
+    given = VOCAB.bits(symptoms)
+    if given & _HIGH_FLAGS or "chest" in description.lower():
+        urgency = {"level": "high", "recommendation": "Seek immediate medical attention (call emergency services or go to ER)."}
+    elif given & _LOW_SYMPTOMS:
+        urgency = {"level": "medium", "recommendation": "Contact your primary care or urgent care for evaluation if symptoms persist or worsen."}
+    return urgency
+
+
+def _load_answer_table():
+    global answer_table
+    try:
+        answer_table = ensure_table(
+            ANSWER_TABLE_DIR, model_version, lambda sets: _batch_model_predictions(sets), _urgency,
+        )
+    except Exception as e:
+        print(f"❌ Error loading answer table: {e}")
+        return
+    if answer_table is not None:
+        print(f"📋 Answer table loaded: {len(answer_table)} symptom sets for model {answer_table.model_version}")
+
+
+def _table_answer(symptoms, description: str, key: str):
+    """Precomputed (predictions, urgency) for the default model, or None."""
+    table = answer_table
+    if table is None or key != "default" or table.model_version != model_version:
+        return None  # never serve answers computed by a different model
+    hit = table.lookup(symptoms)
+    if hit is None:
+        return None
+    predictions, urgency = hit
+    # the table holds the no-description urgency; a description can raise it
+    return predictions[:10], (urgency if not description.strip() else _urgency(symptoms, description))
+
+
+def _when_idle(kind: str, fn, *args):
+    """Run sampled background inference unless requests have queued for a slot since it was scheduled."""
+    if admission.allow_background(kind):
+        fn(*args)
+
+
+def _verify_cascade(symptoms, heuristic_preds, mdl=_DEFAULT, encoder=_DEFAULT):
+    """Background check: would the model have agreed with a heuristic answer?"""
+    try:
+        cascade_stats.record_agreement(heuristic_preds, _model_predictions(symptoms, mdl=mdl, encoder=encoder))
+    except Exception as e:
+        print(f"Cascade verification failed: {e}")
+
+
+def _audit(data, response, started: float, version: str | None = None):
+    if audit_sink is None:
+        return
+    audit_sink.record({
+        "id": uuid.uuid4().hex,
+        "ts": datetime.now().isoformat(),
+        "model_version": version or model_version,
+        "request": data,
+        "response": response,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+    })
+
+
+def _load_shadow():
+    if not SHADOW_MODEL_PATH:
+        return None
+    if SHADOW_MODEL_PATH == "heuristic":
+        return ShadowScorer(
+            "heuristic",
+            lambda s, d: heuristic_predictions(heuristic_scores(s, d)),
+            heuristic_urgency,
+            sample_rate=SHADOW_SAMPLE_RATE,
+        )
+    try:
+        shadow_model = joblib.load(SHADOW_MODEL_PATH)
+        shadow_encoder = joblib.load(SHADOW_ENCODER_PATH)
+    except Exception as e:
+        print(f"❌ Error loading shadow model: {e}")
+        return None
+    print(f"👥 Shadow model loaded from {SHADOW_MODEL_PATH}")
+    return ShadowScorer(
+        f"{SHADOW_MODEL_PATH} ({file_version(SHADOW_MODEL_PATH)})",
+        lambda s, d: _model_predictions(s, mdl=shadow_model, encoder=shadow_encoder),
+        _urgency,
+        sample_rate=SHADOW_SAMPLE_RATE,
+    )
+
+
+shadow_scorer = _load_shadow()
+
+
+@app.post("/explain")
+async def explain(request: Request):
+    """Per-symptom contributions (tree SHAP, log-odds) behind the top-k diseases."""
+    data = await request.json()
+    mdl, encoder, version, key = await _select_model(data)
+    symptoms, _ = _parse_payload(data)
+    top_k = data.get("top_k", 3) if isinstance(data, dict) else 3
+    try:
+        top_k = max(1, min(10, int(top_k)))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="top_k must be an integer")
+    if not symptoms:
+        return {"explanations": [], "unknown_symptoms": [], "status": "no_input"}
+    try:
+        result = await explainer.explain(symptoms, top_k, version, context=(mdl, encoder))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {e}")
+    return {**result, "model": key, "model_version": version, "status": "success"}
+
+
+@app.post("/predict/batch")
+async def predict_batch(request: Request):
+    """Score {"items": [{"symptoms": [...], "description": "..."}, ...]} in one model call.
+
+    Returns {"results": [...]} in input order, each shaped like a /predict response.
+    """
+    started = time.perf_counter()
+    data = await request.json()
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail='Expected {"items": [...]} or a JSON list')
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_ITEMS} items per batch")
+    try:
+        deadline = parse_deadline(request.headers, default_timeout=DEFAULT_REQUEST_TIMEOUT)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid X-Request-Timeout / X-Request-Deadline header")
+    mdl, encoder, version, key = await _select_model(data)
+
+    parsed = [_parse_payload(item) for item in items]
+    scored = [i for i, (symptoms, _) in enumerate(parsed) if symptoms]
+    predictions = {}
+    if scored:
+        try:
+            async with admission.slot(deadline):
+                batch = await run_in_threadpool(
+                    _batch_model_predictions, [parsed[i][0] for i in scored], mdl=mdl, encoder=encoder,
+                )
+        except Rejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+        predictions = dict(zip(scored, batch))
+
+    results = []
+    for i, (symptoms, description) in enumerate(parsed):
+        if i not in predictions:
+            results.append({
+                "predictions": [],
+                "urgency": {"level": "low", "recommendation": "Please provide at least one symptom."},
+                "status": "no_input",
+            })
+            continue
+        results.append({
+            "predictions": predictions[i],
+            "urgency": _urgency(symptoms, description),
+            "status": "success",
+            "tier": "model",
+            "model": key,
+        })
+    response = {"results": results, "model": key, "status": "success"}
+    _audit(data, response, started, version)
+    return response
+
+
+@app.get("/explain/stats")
+async def explain_statistics():
+    return explainer.stats()
+
+
+@app.get("/shadow/stats")
+async def shadow_statistics():
+    if shadow_scorer is None:
+        return {"enabled": False}
+    return {"enabled": True, **shadow_scorer.snapshot()}
+
+
+@app.get("/admission/stats")
+async def admission_statistics():
+    return admission.stats()
+
+
+@app.get("/cascade/stats")
+async def cascade_statistics():
+    return {"mode": PREDICT_MODE, "margin": CASCADE_MARGIN, **cascade_stats.snapshot()}
+
+
+@app.post("/predict")
+async def predict(request: Request, background_tasks: BackgroundTasks):
+    started = time.perf_counter()
+    data = None
+    version = None
+    try:
+        try:
+            deadline = parse_deadline(request.headers, default_timeout=DEFAULT_REQUEST_TIMEOUT)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid X-Request-Timeout / X-Request-Deadline header")
 
         # Get the request data
         data = await request.json()
 
-        # Extract symptoms and optional description
-        if isinstance(data, list):
-            symptoms = data
-            description = ""
-        elif isinstance(data, dict):
-            symptoms = data.get("symptoms", [])
-            description = data.get("description", "")
-        else:
-            symptoms = []
-            description = ""
+        # Pick the requested model (loads it on first use) and ensure it is available
+        mdl, encoder, version, key = await _select_model(data)
+        symptoms, description = _parse_payload(data)
 
         # Basic input validation
         if not symptoms:
-            return {
+            response = {
                 "predictions": [],
                 "urgency": {"level": "low", "recommendation": "Please provide at least one symptom."},
                 "status": "no_input",
             }
+            _audit(data, response, started, version)
+            return response
 
-        # Create input vector (ensure symptoms are strings)
-        symptoms = [str(s).strip() for s in symptoms if s]
-        input_data = {symptom: 1 for symptom in symptoms}
-        input_df = pd.DataFrame([input_data])
-
-        # If model exposes feature names, ensure all are present and ordered
-        feature_names = None
-        if hasattr(model, "feature_names_in_"):
-            feature_names = list(model.feature_names_in_)
-
-        if feature_names:
-            for col in feature_names:
-                if col not in input_df:
-                    input_df[col] = 0
-            input_df = input_df[feature_names]
-
-        # Get predictions (handle model errors cleanly)
-        try:
-            probs = model.predict_proba(input_df)[0]
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Model prediction failed: {e}")
-
-        # Determine class labels safely
-        class_labels = None
-        if hasattr(model, "classes_") and len(getattr(model, "classes_", [])) == len(probs):
-            class_labels = list(model.classes_)
-        elif label_encoder is not None and hasattr(label_encoder, "classes_") and len(label_encoder.classes_) == len(probs):
-            class_labels = list(label_encoder.classes_)
-        else:
-            class_labels = [str(i) for i in range(len(probs))]
-
-        # Build sorted predictions (highest first)
-        import numpy as _np
-
-        idx_sorted = _np.argsort(probs)[::-1]
-        predictions = []
-        for i in idx_sorted[:10]:
-            label = class_labels[i] if i < len(class_labels) else str(i)
-            predictions.append({
-                "disease": str(label),
-                "probability": float(probs[i]),
-            })
+        mode = _request_mode(data)
+        predictions, tier, urgency = None, "model", None
+        table_hit = _table_answer(symptoms, description, key)
+        if table_hit is not None:
+            (predictions, urgency), tier = table_hit, "table"
+        elif mode == "cascade":
+            heuristic_preds, confident = heuristic_answer(symptoms, description, CASCADE_MARGIN)
+            if confident:
+                predictions, tier = heuristic_preds[:10], "heuristic"
+                if cascade_stats.should_verify() and admission.allow_background("cascade_verify"):
+                    # runs after the response is sent
+                    background_tasks.add_task(
+                        _when_idle, "cascade_verify", _verify_cascade, symptoms, predictions, mdl, encoder,
+                    )
+        if predictions is None:
+            # bounded concurrency; requests past their deadline are dropped before inference
+            try:
+                async with admission.slot(deadline):
+                    predictions = await run_in_threadpool(_model_predictions, symptoms, mdl=mdl, encoder=encoder)
+            except Rejected as e:
+                raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
 
-        # Map urgency based on simple heuristics (keeps compatibility with front-end)
-        urgency = {"level": "low", "recommendation": "Monitor your symptoms and follow up if they worsen."}
-        low_symptoms = {"fever", "cough", "fatigue"}
-        high_flags = {"chest_pain", "shortness_of_breath", "severe_breathing"}
-        given = {s.lower().replace(" ", "_") for s in symptoms}
-        if given & high_flags or "chest" in description.lower():
-            urgency = {"level": "high", "recommendation": "Seek immediate medical attention (call emergency services or go to ER)."}
-        elif given & low_symptoms:
-            urgency = {"level": "medium", "recommendation": "Contact your primary care or urgent care for evaluation if symptoms persist or worsen."}
-
-        return {
+        response = {
             "predictions": predictions,
-            "urgency": urgency,
+            "urgency": urgency or _urgency(symptoms, description),
             "status": "success",
+            "tier": tier,
+            "model": key,
         }
+        latency_ms = (time.perf_counter() - started) * 1000
+        if mode == "cascade" and tier != "table":  # table hits are counted in answer_table stats
+            cascade_stats.record(tier, latency_ms)
+        # Only default-model inference is comparable: heuristic and table answers
+        # would skew agreement and latency, and other models are not the primary
+        if (shadow_scorer is not None and tier == "model" and key == "default"
+                and shadow_scorer.should_sample() and admission.allow_background("shadow")):
+            # scored after the response is sent, never on the request path
+            background_tasks.add_task(
+                _when_idle, "shadow", shadow_scorer.compare,
+                symptoms, description, predictions, response["urgency"], latency_ms,
+            )
+        _audit(data, response, started, version)
+        return response
 
-    except HTTPException:
+    except HTTPException as e:
+        _audit(data, {"status": "error", "status_code": e.status_code, "detail": e.detail}, started, version)
         # Re-raise HTTP exceptions for FastAPI to handle
         raise
     except Exception as e:
         print(f"Prediction error: {str(e)}")
+        _audit(data, {"status": "error", "status_code": 500, "detail": str(e)}, started, version)
         raise HTTPException(status_code=500, detail=str(e))
 if __name__ == "__main__":
     print("\n🌐 Starting FastAPI server...")
     print("📌 Available endpoints:")
-    print("   - GET  /health  - Check server and model status")
+    print("   - GET  /health  - Check server status and per-model load state, memory and request counts")
     print("   - POST /predict - Make predictions (accepts multiple input formats)")
+    print("   - POST /predict/batch - Score many symptom sets in one call ({\"items\": [...]})")
+    print("   - POST /explain - Per-symptom contributions for the top-k diseases")
+    print("   - GET  /shadow/stats - Shadow model agreement and latency comparison")
+    print("   - GET  /admission/stats - Accepted/shed counts and queue wait for model inference")
+    print("   - GET  /cascade/stats - Cascade tier hit rates, latency and agreement")
+    print("   - GET/POST /debug/profiling - Switch the sampling profiler on/off, POST /debug/profiling/dump to save stacks")
     print("\n🔗 Open http://localhost:8000/docs for interactive API documentation\n")
     # Import uvicorn here to avoid requiring it at module import time
     try:
@@ -134,4 +592,4 @@ if __name__ == "__main__":
     except Exception:
         print("uvicorn is not installed. Start the server with: python -m uvicorn main:app --reload")
     else:
-        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,9 +1,19 @@
+import math
+
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import List, Dict, Any
 
+from profiling import ProfilerControl, ProfilingMiddleware, add_profiling_routes
+from symptom_vocab import VOCAB
+
 app = FastAPI(title="MediScan Mock Predict Server")
 
+# Opt-in sampling profiler (PROFILE_SAMPLE_RATE or POST /debug/profiling)
+profiler = ProfilerControl.from_env()
+app.add_middleware(ProfilingMiddleware, control=profiler)
+add_profiling_routes(app, profiler)
+
 
 class PredictRequest(BaseModel):
     symptoms: List[str]
@@ -31,35 +41,43 @@ _DISEASE_SYMPTOMS = {
 }
 
 
-@app.post("/predict")
-async def predict(req: PredictRequest) -> Dict[str, Any]:
-    # normalize symptoms
-    given = {s.lower().replace(" ", "_") for s in req.symptoms}
+# the same table as bitsets: (mask, symptom count) per disease
+_DISEASE_MASKS = {disease: (VOCAB.mask(attrs), len(attrs)) for disease, attrs in _DISEASE_SYMPTOMS.items()}
+_HIGH_URGENCY = VOCAB.mask(["chest_pain", "shortness_of_breath"])
+_MEDIUM_URGENCY = VOCAB.mask(["fever", "high_fever", "severe_fatigue"])
+
+
+def heuristic_scores(symptoms: List[str], description: str = "") -> Dict[str, float]:
+    """Raw set-overlap score per disease: matched fraction of its symptoms plus a description boost."""
+    given = VOCAB.bits(symptoms)
+    desc = (description or "").lower()
     # score each disease by matched keywords and simple description boost
     raw_scores = {}
-    for disease, attrs in _DISEASE_SYMPTOMS.items():
-        match_count = len(attrs & given)
-        base = match_count / max(1, len(attrs))
+    for disease, (mask, size) in _DISEASE_MASKS.items():
+        match_count = (mask & given).bit_count()
+        base = match_count / max(1, size)
         desc_boost = 0.0
         for tok in disease.split():
-            if tok in req.description.lower():
+            if tok in desc:
                 desc_boost += 0.12
         raw_scores[disease] = max(0.0, base + desc_boost)
+    return raw_scores
+
+
+def softmax(scores_dict):
+    vals = list(scores_dict.values())
+    if not vals:
+        return {}
+    maxv = max(vals)
+    exps = {k: math.exp(v - maxv) for k, v in scores_dict.items()}
+    s = sum(exps.values())
+    if s <= 0:
+        return {k: 0.0 for k in scores_dict}
+    return {k: exps[k] / s for k in scores_dict}
 
-    # softmax normalize for realistic-looking probabilities
-    import math
-
-    def softmax(scores_dict):
-        vals = list(scores_dict.values())
-        if not vals:
-            return {}
-        maxv = max(vals)
-        exps = {k: math.exp(v - maxv) for k, v in scores_dict.items()}
-        s = sum(exps.values())
-        if s <= 0:
-            return {k: 0.0 for k in scores_dict}
-        return {k: exps[k] / s for k in scores_dict}
 
+def heuristic_predictions(raw_scores: Dict[str, float]) -> List[Dict[str, Any]]:
+    # softmax normalize for realistic-looking probabilities
     probs = softmax(raw_scores)
     preds = [
         {"disease": k, "probability": round(v, 3)}
@@ -73,13 +91,32 @@ async def predict(req: PredictRequest) -> Dict[str, Any]:
             {"disease": "influenza", "probability": 0.3},
             {"disease": "covid-19", "probability": 0.2},
         ]
+    return preds
+
 
+def heuristic_urgency(symptoms: List[str], description: str = "") -> Dict[str, str]:
+    given = VOCAB.bits(symptoms)
     # determine urgency heuristics
     urgency = {"level": "low", "recommendation": "Monitor symptoms and follow up if they worsen."}
     # If chest pain or shortness_of_breath present, mark high
-    if "chest_pain" in given or "shortness_of_breath" in given or "chest" in req.description.lower():
+    if given & _HIGH_URGENCY or "chest" in (description or "").lower():
         urgency = {"level": "high", "recommendation": "Seek immediate medical attention (ER) for chest pain or severe breathing difficulty."}
-    elif any(x in given for x in ("fever", "high_fever", "severe_fatigue")):
+    elif given & _MEDIUM_URGENCY:
         urgency = {"level": "medium", "recommendation": "Contact your primary care or urgent care for evaluation."}
+    return urgency
+
 
+@app.post("/predict")
+async def predict(req: PredictRequest) -> Dict[str, Any]:
+    preds = heuristic_predictions(heuristic_scores(req.symptoms, req.description))
+    urgency = heuristic_urgency(req.symptoms, req.description)
     return {"predictions": preds, "urgency": urgency}
+
+
+class BatchPredictRequest(BaseModel):
+    items: List[PredictRequest]
+
+
+@app.post("/predict/batch")
+async def predict_batch(req: BatchPredictRequest) -> Dict[str, Any]:
+    return {"results": [await predict(item) for item in req.items]}
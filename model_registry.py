@@ -0,0 +1,203 @@
+"""
+model_registry.py
+
+Named / versioned model variants served side by side from one `main.py` process.
+
+Models are declared in a JSON file (MODEL_REGISTRY, default
+`models/registry.json`):
+
+    {
+      "memory_budget_mb": 512,
+      "models": [
+        {"name": "eu", "version": "2025-11", "model_path": "models/eu.pkl", "encoder_path": "models/eu_encoder.pkl"},
+        {"name": "eu", "version": "2025-12", "model_path": "models/eu_v2.pkl", "encoder_path": "models/eu_v2_encoder.pkl"}
+      ]
+    }
+
+An entry is loaded on its first request. When the resident models exceed
+the memory budget, the least-recently-used ones are unloaded. The budget also
+counts the pinned default model, but that one is never evicted. Memory is an
+estimate: the serialized booster size plus the encoder file size.
+
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import joblib
+
+
+class ModelNotFound(KeyError):
+    pass
+
+
+def file_version(path: str) -> str:
+    """Short content hash used to tag which model produced a response."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:12]
+    except OSError:
+        return "unknown"
+
+
+def estimate_model_bytes(model, encoder_path: str | None = None) -> int:
+    """Approximate resident size: serialized booster (or pickled model) plus the encoder file."""
+    size = 0
+    if hasattr(model, "get_booster"):
+        size += len(model.get_booster().save_raw())
+    else:
+        import pickle
+        size += len(pickle.dumps(model))
+    if encoder_path and os.path.exists(encoder_path):
+        size += os.path.getsize(encoder_path)
+    return size
+
+
+class ModelEntry:
+    def __init__(self, name: str, version: str, model_path: str, encoder_path: str):
+        self.name = name
+        self.version = version
+        self.model_path = model_path
+        self.encoder_path = encoder_path
+        self.model = None
+        self.label_encoder = None
+        self.model_version: str | None = None
+        self.memory_bytes = 0
+        self.requests = 0
+        self.loads = 0
+        self.last_used = 0.0
+        self.load_ms: float | None = None
+        self.error: str | None = None
+        self.lock = threading.Lock()
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self):
+        t0 = time.perf_counter()
+        try:
+            self.model = joblib.load(self.model_path)
+            self.label_encoder = joblib.load(self.encoder_path)
+        except Exception as e:
+            self.model = self.label_encoder = None
+            self.error = str(e)
+            raise
+        self.error = None
+        self.model_version = file_version(self.model_path)
+        self.memory_bytes = estimate_model_bytes(self.model, self.encoder_path)
+        self.load_ms = (time.perf_counter() - t0) * 1000
+        self.loads += 1
+
+    def unload(self):
+        self.model = self.label_encoder = None
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "version": self.version,
+            "loaded": self.loaded,
+            "model_version": self.model_version,
+            "memory_bytes_estimate": self.memory_bytes if self.loaded else 0,
+            "requests": self.requests,
+            "loads": self.loads,
+            "load_ms": round(self.load_ms, 3) if self.load_ms is not None else None,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    def __init__(self, memory_budget_bytes: int | None = None):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.pinned_bytes = 0  # resident default model, counted but never evicted
+        self._entries: "OrderedDict[str, ModelEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, path: str, memory_budget_mb: float | None = None) -> "ModelRegistry":
+        config = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                config = json.load(f)
+        budget_mb = memory_budget_mb if memory_budget_mb is not None else config.get("memory_budget_mb")
+        registry = cls(int(budget_mb * 1024 * 1024) if budget_mb else None)
+        base = os.path.dirname(os.path.abspath(path)) if path else os.getcwd()
+        for m in config.get("models", []):
+            def _resolve(p):
+                return p if os.path.isabs(p) or os.path.exists(p) else os.path.join(base, p)
+            registry.register(m["name"], _resolve(m["model_path"]), _resolve(m["encoder_path"]), str(m.get("version", "latest")))
+        return registry
+
+    def register(self, name: str, model_path: str, encoder_path: str, version: str = "latest") -> ModelEntry:
+        entry = ModelEntry(name, version, model_path, encoder_path)
+        with self._lock:
+            self._entries[entry.key] = entry
+        return entry
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def resolve(self, name: str, version: str | None = None) -> ModelEntry:
+        """Find an entry; without a version, the most recently registered one for `name`."""
+        if version:
+            entry = self._entries.get(f"{name}@{version}")
+        else:
+            matches = [e for e in self._entries.values() if e.name == name]
+            entry = matches[-1] if matches else None
+        if entry is None:
+            raise ModelNotFound(f"{name}@{version}" if version else name)
+        return entry
+
+    def get(self, name: str, version: str | None = None) -> Tuple[Any, Any, str]:
+        """Load an entry when needed (evicting LRU entries) and return (model, label_encoder, model_version).
+
+        The three are read under the entry lock. A concurrent eviction can
+        unload the entry right after, but the caller keeps these references.
+        Reading `entry.model` later could see None. Blocking.
+        """
+        entry = self.resolve(name, version)
+        with entry.lock:
+            if not entry.loaded:
+                entry.load()
+                self._evict(keep=entry)
+            loaded = (entry.model, entry.label_encoder, entry.model_version)
+            entry.requests += 1
+            entry.last_used = time.monotonic()
+        return loaded
+
+    def resident_bytes(self) -> int:
+        return self.pinned_bytes + sum(e.memory_bytes for e in self._entries.values() if e.loaded)
+
+    def _evict(self, keep: ModelEntry):
+        if self.memory_budget_bytes is None:
+            return
+        with self._lock:
+            candidates = sorted(
+                (e for e in self._entries.values() if e.loaded and e is not keep),
+                key=lambda e: e.last_used,
+            )
+            for entry in candidates:
+                if self.resident_bytes() <= self.memory_budget_bytes:
+                    break
+                print(f"♻️ Unloading model {entry.key} to stay within memory budget")
+                entry.unload()
+                self.evictions += 1
+        if self.resident_bytes() > self.memory_budget_bytes:
+            print(f"⚠️ Model {keep.key} alone exceeds the memory budget; serving it anyway")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "resident_bytes_estimate": self.resident_bytes(),
+            "evictions": self.evictions,
+            "models": {key: e.info() for key, e in self._entries.items()},
+        }
@@ -0,0 +1,153 @@
+"""
+pdf_reports.py
+
+PDF builders for `streamlit_app.py`. They live outside the Streamlit script
+so the bulk-triage process pool can import them without running the UI.
+
+"""
+import os
+from datetime import datetime
+from typing import List
+
+from fpdf import FPDF
+
+
+def _safe_pdf_text(text: str) -> str:
+    """Return text safe for FPDF (latin-1). Replace common bullets and strip characters
+    that can't be encoded in latin-1 to avoid UnicodeEncodeError.
+    """
+    if not text:
+        return ""
+    text = str(text)
+    # Replace unicode bullet with ASCII dash and common smart quotes
+    for old, new in [("•", "-"), ("“", '"'), ("”", '"'), ("’", "'"), ("–", "-")]:
+        text = text.replace(old, new)
+    # Ensure string is latin-1 encodable; replace unsupported chars with '?'
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def generate_pdf_bytes(symptoms: List[str], preds: list, urgency: dict) -> tuple[bytes, str]:
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "MediScan Clinical Summary", ln=1, align="C")
+    pdf.ln(6)
+    pdf.set_font("Arial", size=12)
+    dt = datetime.now().strftime('%Y-%m-%d %H:%M')
+    pdf.cell(0, 10, f"Date: {dt}", ln=1)
+    pdf.cell(0, 10, "Symptoms:", ln=1)
+    pdf.set_font("Arial", size=10)
+    for s in symptoms[:50]:
+        safe = _safe_pdf_text(s.title())
+        pdf.cell(0, 8, f"- {safe}", ln=1)
+    pdf.ln(4)
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, "Predictions:", ln=1)
+    pdf.set_font("Arial", size=10)
+    for p in (preds or [])[:20]:
+        name = _safe_pdf_text(p.get('disease', 'Unknown'))
+        prob = p.get('probability', 0) * 100
+        pdf.cell(0, 8, f"- {name}: {prob:.1f}%", ln=1)
+    pdf.ln(3)
+    if urgency:
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 8, "Urgency:", ln=1)
+        pdf.set_font("Arial", size=10)
+        pdf.multi_cell(0, 6, _safe_pdf_text(str(urgency)))
+
+    # Try to return in-memory bytes
+    try:
+        pdf_bytes = pdf.output(dest='S').encode('latin-1')
+    except Exception:
+        # Fallback to temp file
+        import tempfile
+        tmpf = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+        tmpf.close()
+        pdf.output(tmpf.name)
+        with open(tmpf.name, 'rb') as _f:
+            pdf_bytes = _f.read()
+        try:
+            os.unlink(tmpf.name)
+        except Exception:
+            pass
+
+    file_name = f"mediscan_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return pdf_bytes, file_name
+
+
+def generate_disease_pdf(disease_name: str, probability: float, symptoms: List[str], preds: list, urgency: dict, info: dict | None) -> tuple[bytes, str]:
+    """Generate a focused PDF report about the most likely disease.
+
+    The report contains: disease name, emoji, probability, description, advice,
+    suggested actions, matched symptoms, and top predictions for context.
+    """
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 18)
+    title = f"{info.get('emoji', '') + ' ' if info else ''}{disease_name}"
+    pdf.cell(0, 12, title, ln=1, align='C')
+    pdf.ln(4)
+
+    pdf.set_font("Arial", size=12)
+    dt = datetime.now().strftime('%Y-%m-%d %H:%M')
+    pdf.cell(0, 8, f"Generated: {dt}", ln=1)
+    pdf.ln(4)
+
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 8, "Estimated Probability:", ln=1)
+    pdf.set_font("Arial", size=12)
+    pdf.cell(0, 8, f"{probability*100:.1f}%", ln=1)
+    pdf.ln(4)
+
+    if info:
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(0, 8, "Overview:", ln=1)
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 6, _safe_pdf_text(info.get('desc', '')))
+        pdf.ln(3)
+
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(0, 8, "Advice / Next Steps:", ln=1)
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 6, _safe_pdf_text(info.get('advice', '')))
+        pdf.ln(3)
+
+    if urgency:
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(0, 8, "Urgency Assessment:", ln=1)
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 6, _safe_pdf_text(str(urgency)))
+        pdf.ln(3)
+
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 8, "Reported Symptoms:", ln=1)
+    pdf.set_font("Arial", size=11)
+    for s in symptoms[:50]:
+        pdf.cell(0, 6, f"- {_safe_pdf_text(s)}", ln=1)
+    pdf.ln(3)
+
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 8, "Top Predictions (context):", ln=1)
+    pdf.set_font("Arial", size=11)
+    for p in (preds or [])[:20]:
+        name = _safe_pdf_text(p.get('disease', 'Unknown'))
+        prob = p.get('probability', 0) * 100
+        pdf.cell(0, 6, f"- {name}: {prob:.1f}%", ln=1)
+
+    # produce bytes
+    try:
+        pdf_bytes = pdf.output(dest='S').encode('latin-1')
+    except Exception:
+        import tempfile
+        tmpf = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+        tmpf.close()
+        pdf.output(tmpf.name)
+        with open(tmpf.name, 'rb') as _f:
+            pdf_bytes = _f.read()
+        try:
+            os.unlink(tmpf.name)
+        except Exception:
+            pass
+
+    file_name = f"disease_summary_{disease_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return pdf_bytes, file_name
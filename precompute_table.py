@@ -0,0 +1,61 @@
+"""
+precompute_table.py
+
+Offline build of the precomputed answer table served by `main.py` (see `answer_table.py`).
+
+Collects the most frequent symptom combinations from a frequency file and/or
+the audit log. The Streamlit PRESETS and the `run_samples.py` SAMPLES are
+always included. The combinations are scored in bulk with the model that
+MODEL_PATH points to, using `main.py`'s own batch scorer and urgency rules, so
+table answers are identical to live ones.
+
+Usage:
+    python precompute_table.py --audit-dir logs/audit --limit 5000
+    python precompute_table.py --freq symptom_counts.csv --out precomputed
+
+The table lands in `<out>/table_<model_version>/`. `main.py` picks it up on
+its next start. When the model changes, `main.py` rebuilds the table for the
+new version itself, from the newest table's combinations.
+
+"""
+import argparse
+import os
+import time
+
+from answer_table import AnswerTable, build_table, collect_combinations
+from presets import PRESETS
+from run_samples import SAMPLES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute top-k answers for frequent symptom combinations")
+    parser.add_argument("--freq", default="", help="CSV with a 'symptoms' column (';'-separated) and optional 'count'")
+    parser.add_argument("--audit-dir", default=os.path.join("logs", "audit"), help="Audit log directory to mine ('' to skip)")
+    parser.add_argument("--limit", type=int, default=5000, help="Number of combinations to keep")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--out", default=os.environ.get("ANSWER_TABLE_DIR", "precomputed"))
+    args = parser.parse_args()
+
+    # importing main loads MODEL_PATH / ENCODER_PATH exactly as the server does
+    import main as server
+    if server.model is None:
+        raise SystemExit("Model could not be loaded; set MODEL_PATH / ENCODER_PATH")
+
+    extra = [txt.split() for txt in PRESETS.values()] + [s["symptoms"] for s in SAMPLES]
+    combos = collect_combinations(
+        args.freq or None, args.audit_dir if args.audit_dir and os.path.isdir(args.audit_dir) else None,
+        extra=extra, limit=args.limit,
+    )
+    print(f"Scoring {len(combos)} symptom combinations with model {server.model_version}...")
+    t0 = time.perf_counter()
+    path = build_table(
+        args.out, combos, lambda sets: server._batch_model_predictions(sets, top_k=args.top_k),
+        server._urgency, server.model_version, top_k=args.top_k,
+    )
+    table = AnswerTable(path)
+    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    print(f"Saved {len(table)} entries ({size / 1024:.1f} KiB) to {path} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
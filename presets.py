@@ -0,0 +1,19 @@
+"""
+presets.py
+
+Common symptoms and example presets shown in the Streamlit UI. Kept in a
+plain module so offline tools (`precompute_table.py`, `bench_symptom_vocab.py`)
+can use them without running the UI.
+
+"""
+SYMPTOMS = [
+    "fever", "cough", "headache", "fatigue", "nausea", "chest_pain",
+    "shortness_of_breath", "dizziness", "sore_throat", "muscle_ache",
+    "loss_of_taste_or_smell", "chills", "vomiting", "diarrhea"
+]
+
+PRESETS = {
+    "Common Cold": "cough sore_throat runny_nose",
+    "Flu-like": "fever chills muscle_ache fatigue",
+    "COVID-like": "fever cough loss_of_taste_or_smell shortness_of_breath",
+}
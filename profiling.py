@@ -0,0 +1,264 @@
+"""
+profiling.py
+
+Opt-in sampling profiler for the FastAPI servers (`main.py`, `mock_predict_server.py`).
+
+`ProfilingMiddleware` is a plain ASGI middleware. While profiling is off it
+does one attribute check and forwards the request. When it is switched on
+(at startup with PROFILE_SAMPLE_RATE, or at runtime via POST /debug/profiling)
+a sampled fraction of requests is profiled. A background thread snapshots
+the Python stacks (`sys._current_frames()`) every few milliseconds until the
+response finishes. Samples are process-wide (idle threads are skipped), so
+concurrent requests can show up in each other's profile.
+
+The cost of profiling is capped in three ways:
+- at most one request is profiled at a time;
+- each request stops sampling after `max_samples` snapshots;
+- new profiles are skipped while the time spent sampling exceeds
+  `max_overhead` (default 2%) of the wall time since profiling was enabled.
+
+POST /debug/profiling/dump writes the collected stacks in folded format (one
+"frame;frame;frame count" line per stack). The files go under
+`outputs/profiles/` and can be read by flamegraph.pl, speedscope or inferno.
+
+The /debug/profiling routes refuse every request unless PROFILE_TOKEN is set,
+and then require it in an X-Profile-Token header. Both servers listen on
+0.0.0.0, so an open profiling switch would let anyone add overhead and write
+files.
+
+"""
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict
+
+from fastapi import FastAPI, HTTPException, Request
+
+# Innermost frames that mean a thread is parked, not doing work
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def _fold_stack(frame, max_depth: int = 64) -> str | None:
+    names = []
+    while frame is not None and len(names) < max_depth:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    if not names:
+        return None
+    leaf = tuple(names[0].split(":", 1))
+    if leaf in _IDLE_FRAMES:
+        return None
+    return ";".join(reversed(names))
+
+
+class _StackSampler(threading.Thread):
+    def __init__(self, interval: float, max_samples: int):
+        super().__init__(daemon=True, name="profiling-sampler")
+        self.interval = interval
+        self.max_samples = max_samples
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.cost_seconds = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while True:
+            t0 = time.perf_counter()
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                folded = _fold_stack(frame)
+                if folded:
+                    self.stacks[folded] += 1
+            self.samples += 1
+            self.cost_seconds += time.perf_counter() - t0
+            if self.samples >= self.max_samples or self._stop_event.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class ProfilerControl:
+    """Runtime switch and aggregate store shared by the middleware and debug routes."""
+
+    def __init__(self, out_dir: str = os.path.join("outputs", "profiles"), interval: float = 0.005,
+                 max_samples: int = 2000, max_overhead: float = 0.02, keep_requests: int = 50):
+        self.out_dir = out_dir
+        self.interval = interval
+        self.max_samples = max_samples
+        self.max_overhead = max_overhead
+        self.enabled = False
+        self.rate = 0.0
+        self.until: float | None = None
+        self._enabled_at = 0.0
+        self._busy = threading.Lock()
+        self.aggregate: Counter = Counter()
+        self.recent: deque = deque(maxlen=keep_requests)
+        self.counters = {"profiled": 0, "skipped_busy": 0, "skipped_budget": 0}
+        self.overhead_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "ProfilerControl":
+        control = cls()
+        rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0") or 0)
+        if rate > 0:
+            control.enable(rate)
+        return control
+
+    def enable(self, rate: float, window_seconds: float | None = None):
+        self.rate = max(0.0, min(1.0, rate))
+        self.until = time.monotonic() + window_seconds if window_seconds else None
+        self._enabled_at = time.monotonic()
+        self.overhead_seconds = 0.0
+        self.enabled = self.rate > 0
+
+    def disable(self):
+        self.enabled = False
+
+    def _over_budget(self) -> bool:
+        elapsed = time.monotonic() - self._enabled_at
+        return elapsed > 0 and self.overhead_seconds / elapsed > self.max_overhead
+
+    def start_sampler(self) -> _StackSampler | None:
+        """Decide whether to profile this request; returns a running sampler or None."""
+        if self.until is not None and time.monotonic() > self.until:
+            self.disable()
+            return None
+        if random.random() >= self.rate:
+            return None
+        if self._over_budget():
+            self.counters["skipped_budget"] += 1
+            return None
+        if not self._busy.acquire(blocking=False):
+            self.counters["skipped_busy"] += 1
+            return None
+        sampler = _StackSampler(self.interval, self.max_samples)
+        sampler.start()
+        return sampler
+
+    def finish(self, sampler: _StackSampler, path: str, duration_ms: float):
+        try:
+            sampler.stop()
+            self.overhead_seconds += sampler.cost_seconds
+            self.aggregate.update(sampler.stacks)
+            self.recent.append({
+                "ts": datetime.now().isoformat(),
+                "path": path,
+                "duration_ms": round(duration_ms, 3),
+                "samples": sampler.samples,
+                "stacks": sampler.stacks,
+            })
+            self.counters["profiled"] += 1
+        finally:
+            self._busy.release()
+
+    def status(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self._enabled_at if self._enabled_at else 0.0
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "window_remaining_s": round(self.until - time.monotonic(), 1) if self.enabled and self.until else None,
+            **self.counters,
+            "overhead_fraction": round(self.overhead_seconds / elapsed, 5) if elapsed else 0.0,
+            "distinct_stacks": len(self.aggregate),
+            "buffered_requests": len(self.recent),
+        }
+
+    def dump(self) -> Dict[str, Any]:
+        """Write aggregate and per-request folded stacks, then clear the buffers."""
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        target = os.path.join(self.out_dir, f"profile_{stamp}")
+        os.makedirs(target, exist_ok=True)
+        aggregate_path = os.path.join(target, "aggregate.folded")
+        _write_folded(aggregate_path, self.aggregate)
+        request_files = []
+        for i, prof in enumerate(self.recent, 1):
+            name = f"request_{i:03d}_{prof['path'].strip('/').replace('/', '_') or 'root'}.folded"
+            _write_folded(os.path.join(target, name), prof["stacks"])
+            request_files.append({"file": name, **{k: v for k, v in prof.items() if k != "stacks"}})
+        self.aggregate = Counter()
+        self.recent.clear()
+        return {"directory": target, "aggregate": aggregate_path, "requests": request_files}
+
+
+def _write_folded(path: str, stacks: Counter):
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, control: ProfilerControl):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        if not self.control.enabled or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        sampler = self.control.start_sampler()
+        if sampler is None:
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.control.finish(sampler, scope.get("path", ""), (time.perf_counter() - started) * 1000)
+
+
+def _number(body: Dict[str, Any], field: str) -> float | None:
+    value = body.get(field)
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"'{field}' must be a number")
+
+
+def add_profiling_routes(app: FastAPI, control: ProfilerControl, token: str | None = None):
+    """Register /debug/profiling endpoints, usable only with the PROFILE_TOKEN token."""
+    token = os.environ.get("PROFILE_TOKEN", "") if token is None else token
+
+    def _check(request: Request):
+        if not token:
+            raise HTTPException(status_code=403, detail="Profiling endpoints are disabled (set PROFILE_TOKEN)")
+        if not hmac.compare_digest(request.headers.get("x-profile-token", ""), token):
+            raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+    @app.get("/debug/profiling")
+    async def profiling_status(request: Request):
+        _check(request)
+        return control.status()
+
+    @app.post("/debug/profiling")
+    async def profiling_configure(request: Request):
+        """Body: {"rate": 0.0-1.0, "window_seconds": optional}. rate 0 turns profiling off."""
+        _check(request)
+        body = await request.json()
+        if not isinstance(body, dict):
+            raise HTTPException(status_code=400, detail="Expected a JSON object")
+        rate = _number(body, "rate") or 0.0
+        if rate > 0:
+            control.enable(rate, _number(body, "window_seconds"))
+        else:
+            control.disable()
+        return control.status()
+
+    @app.post("/debug/profiling/dump")
+    async def profiling_dump(request: Request):
+        _check(request)
+        return control.dump()
@@ -0,0 +1,256 @@
+"""
+search_model.py
+
+Parallel hyperparameter search for the disease model trained by `train_disease_model.py`.
+
+Candidate XGBoost configurations are trained in a process pool. Each worker
+trains with `n_jobs=--threads-per-worker`, so workers x threads never exceeds
+the cores you give it. Every candidate is scored on held-out
+accuracy / log-loss. Serving latency (per-row p50/p99, as `/predict` calls the
+model) is then measured one model at a time in the parent process, so timings
+are not distorted by training running in other workers. The same serial pass
+measures serving memory: how much the process grows when it unpickles the
+model and serves a row, as `main.py` does at startup.
+
+The Pareto front over (log-loss, p99 latency, serving memory) is saved to `outputs/`,
+and the best front member under `--p99-budget-ms` can be exported for `main.py`.
+
+Usage:
+    python search_model.py --data dataset.csv --trials 40 --workers 4 --threads-per-worker 2
+    python search_model.py --data dataset.csv --p99-budget-ms 5 --export disease_xgb_tuned.pkl
+
+"""
+import argparse
+import csv
+import gc
+import os
+import pickle
+import random
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+from sklearn.metrics import log_loss
+
+from compact_model import measure_latency
+from train_disease_model import (
+    DATASET_PATH,
+    build_features,
+    encoder_path_for,
+    holdout_split,
+    load_dataset,
+    save_model,
+    train_model,
+)
+
+SEARCH_SPACE = {
+    "n_estimators": [50, 100, 200, 300, 500],
+    "max_depth": [3, 4, 6, 8, 10],
+    "learning_rate": [0.03, 0.05, 0.1, 0.2, 0.3],
+    "subsample": [0.7, 0.85, 1.0],
+    "colsample_bytree": [0.5, 0.75, 1.0],
+    "min_child_weight": [1, 3, 5],
+}
+
+OBJECTIVES = ("log_loss", "row_p99_ms", "serving_memory_bytes")
+
+# Per-worker state, set once by the pool initializer instead of pickling data per task
+_WORKER: Dict[str, Any] = {}
+
+
+def sample_configs(n_trials: int, seed: int = 42, space=SEARCH_SPACE) -> List[Dict[str, Any]]:
+    """Draw up to `n_trials` distinct configurations from the search space."""
+    rng = random.Random(seed)
+    configs, seen = [], set()
+    max_unique = int(np.prod([len(v) for v in space.values()]))
+    while len(configs) < min(n_trials, max_unique):
+        cfg = {k: rng.choice(v) for k, v in space.items()}
+        key = tuple(sorted(cfg.items()))
+        if key not in seen:
+            seen.add(key)
+            configs.append(cfg)
+    return configs
+
+
+def _init_worker(X_train, y_train, X_test, y_test, num_class: int, threads: int):
+    # `threads` is passed to XGBoost as n_jobs, which caps its thread pool per worker
+    _WORKER.update(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
+                   num_class=num_class, threads=threads)
+
+
+def _evaluate_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    w = _WORKER
+    model = train_model(w["X_train"], w["y_train"], num_class=w["num_class"], n_jobs=w["threads"], **config)
+    probs = model.predict_proba(w["X_test"])
+    accuracy = float(np.mean(np.argmax(probs, axis=1) == w["y_test"]))
+    loss = float(log_loss(w["y_test"], probs, labels=list(range(w["num_class"]))))
+    return {
+        "config": config,
+        "accuracy": accuracy,
+        "log_loss": loss,
+        "booster_size_bytes": len(model.get_booster().save_raw()),
+        "model_pickle": pickle.dumps(model),
+    }
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def measure_serving_memory(model_pickle: bytes, X_row) -> Dict[str, Any]:
+    """Load a pickled model and serve one row, measuring how much memory that takes.
+
+    The resident set size (RSS) delta captures XGBoost's native booster, but
+    it is page-granular and only readable where /proc exists. tracemalloc sees
+    only Python allocations. `serving_memory_bytes` is the larger of the two.
+    The model is returned so the caller can keep it alive: once it is freed,
+    the next load would reuse its pages and show no growth.
+    """
+    gc.collect()
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    model = pickle.loads(model_pickle)
+    model.predict_proba(X_row)
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss_after = _rss_bytes()
+    rss_delta = max(0, rss_after - rss_before) if rss_before is not None and rss_after is not None else None
+    return {
+        "model": model,
+        "rss_delta_bytes": rss_delta,
+        "traced_bytes": traced,
+        "serving_memory_bytes": max(traced, rss_delta or 0),
+    }
+
+
+def run_search(X_train, y_train, X_test, y_test, num_class: int, configs, workers: int = 2,
+               threads_per_worker: int = 1, serving_threads: int = 1) -> List[Dict[str, Any]]:
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(X_train, y_train, X_test, y_test, num_class, threads_per_worker),
+    ) as pool:
+        futures = [pool.submit(_evaluate_config, cfg) for cfg in configs]
+        for i, fut in enumerate(as_completed(futures), 1):
+            res = fut.result()
+            print(f"  [{i}/{len(configs)}] {res['config']} acc={res['accuracy']:.3f} logloss={res['log_loss']:.3f}")
+            results.append(res)
+
+    # Memory and latency are measured serially with the server's thread budget.
+    # Pickles and loaded models stay referenced until the pass ends, so freed
+    # pages are not reused by the next load. A warm-up load first pays XGBoost's
+    # one-time setup, which would otherwise be charged to the first model.
+    print("Measuring serving memory and latency...")
+    blobs = [res.pop("model_pickle") for res in results]
+    loaded = [measure_serving_memory(blobs[0], X_test.iloc[:1])["model"]] if blobs else []
+    for res, blob in zip(results, blobs):
+        mem = measure_serving_memory(blob, X_test.iloc[:1])
+        model = mem.pop("model")
+        loaded.append(model)
+        res.update(mem)
+        model.set_params(n_jobs=serving_threads)
+        res.update(measure_latency(model, X_test))
+    del loaded, blobs
+    return results
+
+
+def pareto_front(results: List[Dict[str, Any]], objectives=OBJECTIVES) -> List[Dict[str, Any]]:
+    """Results not dominated on every objective (all objectives are minimized)."""
+    front = []
+    for r in results:
+        dominated = any(
+            all(o[k] <= r[k] for k in objectives) and any(o[k] < r[k] for k in objectives)
+            for o in results if o is not r
+        )
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r["log_loss"])
+
+
+def pick_within_budget(front: List[Dict[str, Any]], p99_budget_ms: float | None):
+    """Lowest log-loss front member whose per-row p99 meets the budget (None if none does)."""
+    eligible = [r for r in front if p99_budget_ms is None or r["row_p99_ms"] <= p99_budget_ms]
+    return min(eligible, key=lambda r: r["log_loss"]) if eligible else None
+
+
+def write_report(results, front, chosen, out_dir: str = "outputs") -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"search_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    params = list(SEARCH_SPACE)
+    metrics = ["accuracy", "log_loss", "row_p50_ms", "row_p99_ms", "batch_row_us", "serving_memory_bytes",
+               "rss_delta_bytes", "traced_bytes", "booster_size_bytes"]
+
+    with open(stem + ".csv", "w", newline="", encoding="utf-8") as cf:
+        writer = csv.DictWriter(cf, fieldnames=params + metrics + ["pareto", "chosen"])
+        writer.writeheader()
+        for r in results:
+            writer.writerow({**{p: r["config"].get(p) for p in params}, **{m: r[m] for m in metrics},
+                             "pareto": any(r is f for f in front), "chosen": r is chosen})
+
+    with open(stem + ".md", "w", encoding="utf-8") as mf:
+        mf.write(f"# Hyperparameter Search — Pareto Front — {datetime.now().isoformat()}\n\n")
+        mf.write("| config | accuracy | log-loss | row p50 (ms) | row p99 (ms) | serving memory (KB) | booster size (KB) |\n")
+        mf.write("|---|---|---|---|---|---|---|\n")
+        for r in front:
+            mark = " **(chosen)**" if r is chosen else ""
+            cfg = ", ".join(f"{k}={v}" for k, v in r["config"].items())
+            mf.write(f"| {cfg}{mark} | {r['accuracy']:.3f} | {r['log_loss']:.3f} | {r['row_p50_ms']:.2f} | "
+                     f"{r['row_p99_ms']:.2f} | {r['serving_memory_bytes'] / 1024:.1f} | "
+                     f"{r['booster_size_bytes'] / 1024:.1f} |\n")
+    return stem
+
+
+def main():
+    cpus = os.cpu_count() or 2
+    parser = argparse.ArgumentParser(description="Parallel XGBoost search scored on accuracy, latency and serving memory")
+    parser.add_argument("--data", default=DATASET_PATH, help="Training CSV (must contain a 'Disease' column)")
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=max(1, cpus // 2))
+    parser.add_argument("--threads-per-worker", type=int, default=0,
+                        help="XGBoost threads per worker (default: cores / workers)")
+    parser.add_argument("--serving-threads", type=int, default=1, help="Threads used when timing predictions")
+    parser.add_argument("--p99-budget-ms", type=float, default=None, help="Per-row p99 latency budget")
+    parser.add_argument("--export", default="", help="Save the chosen model to this path")
+    parser.add_argument("--encoder-out", default="",
+                        help="Label encoder path (default: <export>_encoder.pkl next to the model)")
+    args = parser.parse_args()
+
+    threads = args.threads_per_worker or max(1, cpus // args.workers)
+    df = load_dataset(args.data)
+    X, y_encoded, label_encoder = build_features(df)
+    num_class = len(label_encoder.classes_)
+    X_train, X_test, y_train, y_test = holdout_split(X, y_encoded, test_size=args.test_size, seed=args.seed)
+
+    configs = sample_configs(args.trials, seed=args.seed)
+    print(f"Searching {len(configs)} configurations with {args.workers} workers x {threads} threads...")
+    results = run_search(X_train, y_train, X_test, y_test, num_class, configs,
+                         workers=args.workers, threads_per_worker=threads, serving_threads=args.serving_threads)
+
+    front = pareto_front(results)
+    chosen = pick_within_budget(front, args.p99_budget_ms)
+    stem = write_report(results, front, chosen)
+    print(f"Saved search results to {stem}.csv and Pareto front to {stem}.md ({len(front)} configurations)")
+
+    if chosen is None:
+        print(f"No configuration meets the p99 budget of {args.p99_budget_ms}ms")
+        return
+    print(f"Chosen: {chosen['config']} (log-loss {chosen['log_loss']:.3f}, p99 {chosen['row_p99_ms']:.2f}ms)")
+    if args.export:
+        model = train_model(X, y_encoded, num_class=num_class, **chosen["config"])
+        encoder_out = args.encoder_out or encoder_path_for(args.export)
+        save_model(model, label_encoder, args.export, encoder_out)
+        print(f"Exported tuned model to {args.export} and encoder to {encoder_out} "
+              f"(serve with MODEL_PATH={args.export} ENCODER_PATH={encoder_out})")
+
+
+if __name__ == "__main__":
+    main()
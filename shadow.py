@@ -0,0 +1,87 @@
+"""
+shadow.py
+
+Shadow scoring of a candidate model on live traffic.
+
+`main.py` hands a sampled fraction of /predict requests answered by the
+default model (not the cascade heuristic, the answer table or another
+registry model) to `ShadowScorer.compare()` as a background task. The task
+runs after the primary response has been sent, so users never wait on the
+shadow. The shadow can be a second XGBoost model (SHADOW_MODEL_PATH) or the
+`mock_predict_server` heuristic (SHADOW_MODEL_PATH=heuristic).
+
+Aggregates (GET /shadow/stats):
+- top-1 agreement and mean top-k overlap with the primary predictions;
+- urgency disagreement rate, broken down as primary level -> shadow level;
+- latency percentiles for the primary request and for the shadow scoring.
+
+"""
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List
+
+from latency_stats import percentiles
+
+
+class ShadowScorer:
+    def __init__(self, name: str, predict_fn: Callable, urgency_fn: Callable,
+                 sample_rate: float = 0.1, top_k: int = 3, window: int = 10000):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.urgency_fn = urgency_fn
+        self.sample_rate = sample_rate
+        self.top_k = top_k
+        # background tasks run in the threadpool, so updates are serialized
+        self._lock = threading.Lock()
+        self.counters = {"compared": 0, "errors": 0, "top1_agree": 0, "urgency_disagree": 0}
+        self._topk_overlap_sum = 0.0
+        self.urgency_pairs: Counter = Counter()
+        self.latencies = {"primary": deque(maxlen=window), "shadow": deque(maxlen=window)}
+
+    def should_sample(self) -> bool:
+        return random.random() < self.sample_rate
+
+    def compare(self, symptoms: List[str], description: str, primary_preds, primary_urgency, primary_latency_ms: float):
+        t0 = time.perf_counter()
+        try:
+            shadow_preds = self.predict_fn(symptoms, description)
+            shadow_urgency = self.urgency_fn(symptoms, description)
+        except Exception as e:
+            print(f"Shadow scoring failed: {e}")
+            with self._lock:
+                self.counters["errors"] += 1
+            return
+        shadow_ms = (time.perf_counter() - t0) * 1000
+
+        top1 = bool(primary_preds and shadow_preds) and \
+            primary_preds[0]["disease"].strip().lower() == shadow_preds[0]["disease"].strip().lower()
+        p_top = {p["disease"].strip().lower() for p in primary_preds[:self.top_k]}
+        s_top = {p["disease"].strip().lower() for p in shadow_preds[:self.top_k]}
+        p_level = (primary_urgency or {}).get("level")
+        s_level = (shadow_urgency or {}).get("level")
+
+        with self._lock:
+            self.counters["compared"] += 1
+            self.counters["top1_agree"] += int(top1)
+            self._topk_overlap_sum += len(p_top & s_top) / self.top_k
+            if p_level != s_level:
+                self.counters["urgency_disagree"] += 1
+            self.urgency_pairs[f"{p_level}->{s_level}"] += 1
+            self.latencies["primary"].append(primary_latency_ms)
+            self.latencies["shadow"].append(shadow_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self.counters["compared"]
+            return {
+                "shadow": self.name,
+                "sample_rate": self.sample_rate,
+                **self.counters,
+                "top1_agreement": self.counters["top1_agree"] / n if n else None,
+                f"top{self.top_k}_overlap": self._topk_overlap_sum / n if n else None,
+                "urgency_disagreement": self.counters["urgency_disagree"] / n if n else None,
+                "urgency_pairs": dict(self.urgency_pairs),
+                "latency_ms": {k: percentiles(v) for k, v in self.latencies.items()},
+            }
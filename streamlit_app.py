@@ -2,26 +2,17 @@
 import streamlit as st
 import time
 from datetime import datetime
-from fpdf import FPDF
 import base64
 from io import BytesIO
 import requests
 import os
 from typing import List
 
-
-def _safe_pdf_text(text: str) -> str:
-    """Return text safe for FPDF (latin-1). Replace common bullets and strip characters
-    that can't be encoded in latin-1 to avoid UnicodeEncodeError.
-    """
-    if not text:
-        return ""
-    text = str(text)
-    # Replace unicode bullet with ASCII dash and common smart quotes
-    for old, new in [("•", "-"), ("“", '"'), ("”", '"'), ("’", "'"), ("–", "-")]:
-        text = text.replace(old, new)
-    # Ensure string is latin-1 encodable; replace unsupported chars with '?'
-    return text.encode("latin-1", "replace").decode("latin-1")
+import bulk_triage
+from live_predict import LivePredictor
+from pdf_reports import generate_disease_pdf, generate_pdf_bytes
+from presets import PRESETS, SYMPTOMS
+from symptom_vocab import canonical
 
 
 # ========================= CONFIG / STATE =========================
@@ -36,6 +27,8 @@ if "history" not in st.session_state:
     st.session_state["history"] = []
 if "api_url" not in st.session_state:
     st.session_state["api_url"] = "http://localhost:8000/predict"
+if "live_mode" not in st.session_state:
+    st.session_state["live_mode"] = False
 
 
 # App title
@@ -206,22 +199,12 @@ def _find_disease_info(disease_name: str):
 
 
 # ========================= SYMPTOM INPUT =========================
-SYMPTOMS = [
-    "fever", "cough", "headache", "fatigue", "nausea", "chest_pain",
-    "shortness_of_breath", "dizziness", "sore_throat", "muscle_ache",
-    "loss_of_taste_or_smell", "chills", "vomiting", "diarrhea"
-]
 
 
 # Sidebar: API config, presets and history
 st.sidebar.header("Configuration & History")
 st.sidebar.text_input("API URL", key="api_url")
-
-PRESETS = {
-    "Common Cold": "cough sore_throat runny_nose",
-    "Flu-like": "fever chills muscle_ache fatigue",
-    "COVID-like": "fever cough loss_of_taste_or_smell shortness_of_breath",
-}
+st.sidebar.toggle("Live suggestions while typing", key="live_mode")
 
 st.sidebar.markdown("**Example presets**")
 for name, txt in PRESETS.items():
@@ -251,23 +234,35 @@ if st.session_state["history"]:
 REPORTS_DIR = os.path.join(os.getcwd(), "reports")
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
+@st.cache_data(ttl=300, max_entries=4)
+def _saved_reports(reports_dir: str, dir_mtime: float, limit: int = 12):
+    """(file name, bytes) of the newest saved PDFs.
+
+    Keyed on the directory mtime, so the listing and file reads only happen
+    again when a report is added or removed, not on every rerun.
+    """
+    try:
+        reports = sorted(
+            [f for f in os.listdir(reports_dir) if f.lower().endswith('.pdf')],
+            key=lambda x: os.path.getmtime(os.path.join(reports_dir, x)),
+            reverse=True,
+        )
+    except Exception:
+        return []
+    listing = []
+    for r in reports[:limit]:
+        with open(os.path.join(reports_dir, r), 'rb') as _f:
+            listing.append((r, _f.read()))
+    return listing
+
+
 # List saved report files (most recent first)
 st.sidebar.markdown("---")
 st.sidebar.subheader("Saved Reports")
-try:
-    reports = sorted(
-        [f for f in os.listdir(REPORTS_DIR) if f.lower().endswith('.pdf')],
-        key=lambda x: os.path.getmtime(os.path.join(REPORTS_DIR, x)),
-        reverse=True,
-    )
-except Exception:
-    reports = []
+reports = _saved_reports(REPORTS_DIR, os.path.getmtime(REPORTS_DIR))
 
 if reports:
-    for r in reports[:12]:
-        path = os.path.join(REPORTS_DIR, r)
-        with open(path, 'rb') as _f:
-            bytes_data = _f.read()
+    for r, bytes_data in reports:
         st.sidebar.write(r)
         st.sidebar.download_button(label="Download", data=bytes_data, file_name=r, mime="application/pdf")
 else:
@@ -277,40 +272,25 @@ st.sidebar.markdown("---")
 st.sidebar.info("This tool is for educational purposes only. Always consult a doctor.")
 
 
-# Main input area
-col1, col2 = st.columns([3, 1])
-
-with col1:
-    symptoms_text = st.text_area(
-        "Describe your symptoms (voice input appears here):",
-        value=st.session_state.get("symptoms_text", ""),
-        key="symptoms_text",
-        height=120,
-        placeholder="Or type manually..."
-    )
-
-with col2:
-    selected_symptoms = st.multiselect(
-        "Or select common symptoms:",
-        options=SYMPTOMS,
-        default=st.session_state.get("selected_symptoms", []),
-        key="selected_symptoms",
-    )
-
-all_symptoms = list(dict.fromkeys(selected_symptoms + [
-    s.strip() for s in str(symptoms_text).lower().replace(",", " ").split() if s.strip()
-]))
+# ========================= PREDICTION =========================
+PREDICT_TIMEOUT = 15
+# live suggestions: shorter timeout, debounce before sending, fragment poll interval
+LIVE_TIMEOUT = 5
+LIVE_DEBOUNCE_S = 0.6
+LIVE_POLL_S = 0.3
 
 
-# ========================= PREDICTION =========================
-@st.cache_data(ttl=30)
-def predict_cached(api_url: str, symptoms_list: List[str], description: str):
+def _post_predict(api_url: str, symptoms_list: List[str], description: str, timeout: float = PREDICT_TIMEOUT):
     try:
         resp = requests.post(
             api_url,
             json={"symptoms": symptoms_list, "description": description},
-            timeout=15,
+            # tell the server when we stop waiting so it can drop the work instead
+            headers={"X-Request-Timeout": str(timeout)},
+            timeout=timeout,
         )
+        if resp.status_code == 503 and "Retry-After" in resp.headers:
+            return None, f"Server is busy, please retry in {resp.headers['Retry-After']} s"
         resp.raise_for_status()
         try:
             return resp.json(), None
@@ -320,135 +300,23 @@ def predict_cached(api_url: str, symptoms_list: List[str], description: str):
         return None, str(e)
 
 
-def generate_pdf_bytes(symptoms: List[str], preds: list, urgency: dict) -> tuple[bytes, str]:
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "MediScan Clinical Summary", ln=1, align="C")
-    pdf.ln(6)
-    pdf.set_font("Arial", size=12)
-    dt = datetime.now().strftime('%Y-%m-%d %H:%M')
-    pdf.cell(0, 10, f"Date: {dt}", ln=1)
-    pdf.cell(0, 10, "Symptoms:", ln=1)
-    pdf.set_font("Arial", size=10)
-    for s in symptoms[:50]:
-        safe = _safe_pdf_text(s.title())
-        pdf.cell(0, 8, f"- {safe}", ln=1)
-    pdf.ln(4)
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 8, "Predictions:", ln=1)
-    pdf.set_font("Arial", size=10)
-    for p in (preds or [])[:20]:
-        name = _safe_pdf_text(p.get('disease', 'Unknown'))
-        prob = p.get('probability', 0) * 100
-        pdf.cell(0, 8, f"- {name}: {prob:.1f}%", ln=1)
-    pdf.ln(3)
-    if urgency:
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 8, "Urgency:", ln=1)
-        pdf.set_font("Arial", size=10)
-        pdf.multi_cell(0, 6, _safe_pdf_text(str(urgency)))
-
-    # Try to return in-memory bytes
-    try:
-        pdf_bytes = pdf.output(dest='S').encode('latin-1')
-    except Exception:
-        # Fallback to temp file
-        import tempfile
-        tmpf = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
-        tmpf.close()
-        pdf.output(tmpf.name)
-        with open(tmpf.name, 'rb') as _f:
-            pdf_bytes = _f.read()
-        try:
-            os.unlink(tmpf.name)
-        except Exception:
-            pass
-
-    file_name = f"mediscan_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    return pdf_bytes, file_name
-
-
-def generate_disease_pdf(disease_name: str, probability: float, symptoms: List[str], preds: list, urgency: dict, info: dict | None) -> tuple[bytes, str]:
-    """Generate a focused PDF report about the most likely disease.
-
-    The report contains: disease name, emoji, probability, description, advice,
-    suggested actions, matched symptoms, and top predictions for context.
-    """
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 18)
-    title = f"{info.get('emoji', '') + ' ' if info else ''}{disease_name}"
-    pdf.cell(0, 12, title, ln=1, align='C')
-    pdf.ln(4)
-
-    pdf.set_font("Arial", size=12)
-    dt = datetime.now().strftime('%Y-%m-%d %H:%M')
-    pdf.cell(0, 8, f"Generated: {dt}", ln=1)
-    pdf.ln(4)
-
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 8, "Estimated Probability:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(0, 8, f"{probability*100:.1f}%", ln=1)
-    pdf.ln(4)
-
-    if info:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 8, "Overview:", ln=1)
-        pdf.set_font("Arial", size=11)
-        pdf.multi_cell(0, 6, _safe_pdf_text(info.get('desc', '')))
-        pdf.ln(3)
-
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 8, "Advice / Next Steps:", ln=1)
-        pdf.set_font("Arial", size=11)
-        pdf.multi_cell(0, 6, _safe_pdf_text(info.get('advice', '')))
-        pdf.ln(3)
-
-    if urgency:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 8, "Urgency Assessment:", ln=1)
-        pdf.set_font("Arial", size=11)
-        pdf.multi_cell(0, 6, _safe_pdf_text(str(urgency)))
-        pdf.ln(3)
-
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 8, "Reported Symptoms:", ln=1)
-    pdf.set_font("Arial", size=11)
-    for s in symptoms[:50]:
-        pdf.cell(0, 6, f"- {_safe_pdf_text(s)}", ln=1)
-    pdf.ln(3)
-
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 8, "Top Predictions (context):", ln=1)
-    pdf.set_font("Arial", size=11)
-    for p in (preds or [])[:20]:
-        name = _safe_pdf_text(p.get('disease', 'Unknown'))
-        prob = p.get('probability', 0) * 100
-        pdf.cell(0, 6, f"- {name}: {prob:.1f}%", ln=1)
-
-    # produce bytes
-    try:
-        pdf_bytes = pdf.output(dest='S').encode('latin-1')
-    except Exception:
-        import tempfile
-        tmpf = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
-        tmpf.close()
-        pdf.output(tmpf.name)
-        with open(tmpf.name, 'rb') as _f:
-            pdf_bytes = _f.read()
-        try:
-            os.unlink(tmpf.name)
-        except Exception:
-            pass
+@st.cache_data(ttl=30)
+def predict_cached(api_url: str, symptoms_list: List[str], description: str):
+    return _post_predict(api_url, symptoms_list, description)
 
-    file_name = f"disease_summary_{disease_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    return pdf_bytes, file_name
 
+def _live_predictor() -> LivePredictor:
+    """Per-session live predictor, rebuilt when the API URL changes."""
+    api_url = st.session_state.get("api_url")
+    url, predictor = st.session_state.get("live_predictor", (None, None))
+    if predictor is None or url != api_url:
+        if predictor is not None:
+            predictor.close()
+        # the worker thread has no Streamlit context, so it gets the URL, not session_state
+        predictor = LivePredictor(lambda s, d: _post_predict(api_url, s, d, LIVE_TIMEOUT), debounce_s=LIVE_DEBOUNCE_S)
+        st.session_state["live_predictor"] = (api_url, predictor)
+    return predictor
 
-check_label = "🔎 Check My Symptoms"
-download_label = "📄 Download Clinical Summary (PDF)"
 
 def _render_probability_bar(name: str, prob: float) -> str:
     # returns HTML for a simple inline bar
@@ -460,6 +328,73 @@ def _render_probability_bar(name: str, prob: float) -> str:
     )
 
 
+def _collect_symptoms(selected_symptoms: List[str], symptoms_text: str) -> List[str]:
+    return list(dict.fromkeys(list(selected_symptoms) + [
+        canonical(s) for s in str(symptoms_text).replace(",", " ").split()
+    ]))
+
+
+# Main input area. As a fragment, editing symptoms reruns only this block,
+# not the sidebar history and saved-reports listing.
+@st.fragment
+def symptom_inputs():
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        st.text_area(
+            "Describe your symptoms (voice input appears here):",
+            value=st.session_state.get("symptoms_text", ""),
+            key="symptoms_text",
+            height=120,
+            placeholder="Or type manually..."
+        )
+
+    with col2:
+        st.multiselect(
+            "Or select common symptoms:",
+            options=SYMPTOMS,
+            default=st.session_state.get("selected_symptoms", []),
+            key="selected_symptoms",
+        )
+
+
+# Live ranked suggestions: polls the debounced predictor, only while live mode is on
+@st.fragment(run_every=LIVE_POLL_S if st.session_state.get("live_mode") else None)
+def live_suggestions():
+    if not st.session_state.get("live_mode"):
+        return
+    predictor = _live_predictor()
+    predictor.update(
+        _collect_symptoms(st.session_state.get("selected_symptoms", []), st.session_state.get("symptoms_text", "")),
+        st.session_state.get("symptoms_text", ""),
+    )
+    state = predictor.tick()
+    if state["status"] == "idle":
+        st.caption("Live suggestions appear as you add symptoms.")
+        return
+    if state["status"] == "error":
+        st.caption(f"Live suggestions unavailable: {state['error']}")
+        return
+    if state["result"] is None:
+        st.caption("Updating suggestions…")
+        return
+    st.caption("Live suggestions" + (" (updating…)" if state["stale"] else ""))
+    for p in state["result"].get("predictions", [])[:5]:
+        st.markdown(_render_probability_bar(p.get("disease", "Unknown"), p.get("probability", 0)), unsafe_allow_html=True)
+
+
+symptom_inputs()
+live_suggestions()
+
+symptoms_text = st.session_state.get("symptoms_text", "")
+selected_symptoms = st.session_state.get("selected_symptoms", [])
+all_symptoms = _collect_symptoms(selected_symptoms, symptoms_text)
+
+
+
+check_label = "🔎 Check My Symptoms"
+download_label = "📄 Download Clinical Summary (PDF)"
+
 if st.button(check_label):
     if not all_symptoms:
         st.warning("Please add at least one symptom.")
@@ -554,3 +489,55 @@ if st.button(check_label):
                 file_name=file_name,
                 mime="application/pdf",
             )
+
+
+# ========================= BULK TRIAGE =========================
+st.markdown("---")
+with st.expander("📋 Bulk triage (CSV upload)"):
+    st.caption("One patient per row: a `symptoms` column (separated by `;`, `,` or spaces), "
+               "optional `patient_id` and `description` columns.")
+    bulk_file = st.file_uploader("Patients CSV", type=["csv"], key="bulk_csv")
+    if bulk_file is not None and st.button("Run bulk triage"):
+        try:
+            patients = bulk_triage.read_patients(bulk_file)
+        except Exception as e:
+            st.error(f"Could not read CSV: {e}")
+            patients = []
+        if patients:
+            bar = st.progress(0.0, text="Sending patients to the API…")
+            rows = bulk_triage.triage(
+                patients, st.session_state.get("api_url"),
+                progress=lambda done, total: bar.progress(done / total / 2, text=f"Triaged {done}/{total} patients"),
+            )
+            # written to a temp file one PDF at a time; this session's previous ZIP and stale ones are removed
+            previous = (st.session_state.get("bulk_result") or {}).get("zip_path")
+            if previous and os.path.exists(previous):
+                os.remove(previous)
+            zip_path = bulk_triage.new_zip_path()
+            bulk_triage.build_report_zip(
+                rows, zip_path,
+                progress=lambda done, total: bar.progress(0.5 + done / max(total, 1) / 2, text=f"Rendered {done}/{total} PDFs"),
+            )
+            bar.progress(1.0, text="Done")
+            st.session_state["bulk_result"] = {"zip_path": zip_path, "rows": [
+                {"patient": r["patient_id"],
+                 "top disease": ((r["result"] or {}).get("predictions") or [{}])[0].get("disease", ""),
+                 "urgency": ((r["result"] or {}).get("urgency") or {}).get("level", ""),
+                 "error": r["error"] or ""}
+                for r in rows
+            ]}
+
+    bulk = st.session_state.get("bulk_result")
+    if bulk and os.path.exists(bulk["zip_path"]):
+        errors = sum(1 for r in bulk["rows"] if r["error"])
+        st.write(f"{len(bulk['rows'])} patients triaged" + (f", {errors} failed" if errors else ""))
+        st.dataframe(bulk["rows"], use_container_width=True)
+        # not streamed: the button reads the whole ZIP into server memory
+        st.caption(f"ZIP size: {os.path.getsize(bulk['zip_path']) / 1024 / 1024:.1f} MB")
+        with open(bulk["zip_path"], "rb") as zf:
+            st.download_button(
+                label="📦 Download all reports (ZIP)",
+                data=zf,
+                file_name=os.path.basename(bulk["zip_path"]),
+                mime="application/zip",
+            )
@@ -0,0 +1,114 @@
+"""
+symptom_vocab.py
+
+Shared symptom vocabulary: each canonical symptom name is interned to a small
+integer ID once, and a symptom set becomes an int bitset.
+
+- `canonical(name)`: the one normalization used everywhere ("Chest Pain " ->
+  "chest_pain"). `canonical_set(symptoms)` is the sorted tuple of distinct
+  canonical names, the set key for caches and persisted tables.
+- `VOCAB.bits(symptoms)`: bitset of the known symptoms in a request. It never
+  interns, so arbitrary request strings can't grow the vocabulary. Unknown
+  names are skipped; no model feature or heuristic rule matches them anyway.
+- `VOCAB.mask(names)`: interns names (model features, heuristic rules) and
+  returns their bitset. Call it at load time, not per request.
+- Intersection is `a & b`, overlap size is `(a & b).bit_count()`, and the
+  bitset itself is a cheap hashable cache key.
+- `pack(bitsets)`: a batch as a uint8 array (rows x bytes, little-endian bit
+  order) for vectorized work.
+- `FeatureMap(feature_names)`: turns bitsets into a model's 0/1 feature
+  matrix with a single numpy gather, whatever the column order.
+
+Bit IDs depend on interning order, so they are only valid inside one process.
+Anything persisted (e.g. `answer_table.py` keys) must hash names, not bits.
+
+"""
+import threading
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+def canonical(name) -> str:
+    return "_".join(str(name).strip().lower().split())
+
+
+def canonical_set(symptoms: Iterable[str]) -> tuple:
+    return tuple(sorted({canonical(s) for s in symptoms if str(s).strip()}))
+
+
+class SymptomVocab:
+    def __init__(self, names: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+        self.mask(names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, name) -> int:
+        key = canonical(name)
+        i = self._ids.get(key)
+        if i is None:
+            with self._lock:
+                i = self._ids.get(key)
+                if i is None:
+                    i = len(self._names)
+                    self._names.append(key)
+                    self._ids[key] = i
+        return i
+
+    def mask(self, names: Iterable[str]) -> int:
+        bits = 0
+        for name in names:
+            bits |= 1 << self.intern(name)
+        return bits
+
+    def id(self, name) -> int | None:
+        i = self._ids.get(name)  # most requests already send canonical names
+        return i if i is not None else self._ids.get(canonical(name))
+
+    def bits(self, symptoms: Iterable[str]) -> int:
+        ids = self._ids
+        bits = 0
+        for s in symptoms:
+            i = ids.get(s)
+            if i is None:
+                i = ids.get(canonical(s))
+                if i is None:
+                    continue
+            bits |= 1 << i
+        return bits
+
+    def names(self, bits: int) -> List[str]:
+        """Canonical names in a bitset, in ID order."""
+        out = []
+        while bits:
+            low = bits & -bits
+            out.append(self._names[low.bit_length() - 1])
+            bits ^= low
+        return out
+
+    def pack(self, bitsets: List[int]) -> np.ndarray:
+        width = (len(self._names) + 7) // 8 or 1
+        buf = b"".join(b.to_bytes(width, "little") for b in bitsets)
+        return np.frombuffer(buf, dtype=np.uint8).reshape(len(bitsets), width)
+
+
+VOCAB = SymptomVocab()
+
+
+class FeatureMap:
+    """Bitset -> model feature matrix for one model's column order."""
+
+    def __init__(self, feature_names: Iterable[str], vocab: SymptomVocab = VOCAB):
+        self.vocab = vocab
+        self.feature_names = list(feature_names)
+        self.feature_ids = np.array([vocab.intern(f) for f in self.feature_names], dtype=np.int64)
+        self.mask = vocab.mask(self.feature_names)
+
+    def matrix(self, bitsets: List[int], dtype=np.int64) -> np.ndarray:
+        packed = self.vocab.pack([b & self.mask for b in bitsets])
+        dense = np.unpackbits(packed, axis=1, bitorder="little")
+        return dense[:, self.feature_ids].astype(dtype, copy=False)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+SYMPTOM_COLUMNS = ["Fever", "Cough", "Fatigue", "Difficulty Breathing"]
+DISEASES = ["Influenza", "Common Cold", "Asthma", "Migraine"]
+
+
+def make_symptom_df(n_rows: int = 120, seed: int = 0, diseases=DISEASES) -> pd.DataFrame:
+    """Small dataset shaped like the Kaggle disease/symptom CSV used in training."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_rows):
+        disease = diseases[i % len(diseases)]
+        k = diseases.index(disease) if disease in DISEASES else i
+        row = {"Disease": disease}
+        for j, col in enumerate(SYMPTOM_COLUMNS):
+            # each disease has a characteristic symptom pattern plus noise
+            present = ((k >> (j % 2)) + j) % 2 == 0
+            if rng.random() < 0.15:
+                present = not present
+            row[col] = "Yes" if present else "No"
+        row["Gender"] = "Female" if rng.random() < 0.5 else "Male"
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def symptom_df():
+    return make_symptom_df()
+
+
+MAIN_FEATURES = ["fever", "cough", "fatigue", "headache", "chest_pain", "shortness_of_breath", "sneezing", "nausea"]
+
+
+def make_main_model(seed: int = 0):
+    """Tiny XGBoost model + label encoder over symptom-named features, as main.py expects."""
+    from sklearn.preprocessing import LabelEncoder
+    from train_disease_model import train_model
+
+    rng = np.random.default_rng(seed)
+    patterns = {
+        "Influenza": ["fever", "fatigue", "headache"],
+        "Common Cold": ["cough", "sneezing"],
+        "Pneumonia": ["fever", "cough", "chest_pain", "shortness_of_breath"],
+        "Migraine": ["headache", "nausea"],
+    }
+    rows, labels = [], []
+    for i in range(160):
+        disease = list(patterns)[i % len(patterns)]
+        row = {f: int(f in patterns[disease]) for f in MAIN_FEATURES}
+        flip = rng.choice(MAIN_FEATURES)
+        row[flip] = 1 - row[flip]
+        rows.append(row)
+        labels.append(disease)
+    X = pd.DataFrame(rows, columns=MAIN_FEATURES)
+    le = LabelEncoder()
+    y = le.fit_transform(labels)
+    model = train_model(X, y, num_class=len(le.classes_), n_estimators=20, max_depth=3)
+    return model, le
+
+
+@pytest.fixture
+def served_model(monkeypatch):
+    """Install a tiny model into main.py and return the module."""
+    import main
+
+    model, le = make_main_model()
+    monkeypatch.setattr(main, "model", model)
+    monkeypatch.setattr(main, "label_encoder", le)
+    monkeypatch.setattr(main, "model_version", "test-model")
+    return main
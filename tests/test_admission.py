@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from admission import AdmissionController, Rejected, parse_deadline
+
+
+def test_queue_full_and_expired_deadlines_are_shed():
+    async def scenario():
+        ctrl = AdmissionController(max_inflight=1, max_queue=1)
+        order = []
+        release = asyncio.Event()
+
+        async def hold():
+            async with ctrl.slot():
+                order.append("first")
+                await release.wait()
+
+        async def queued():
+            async with ctrl.slot():
+                order.append("second")
+
+        first = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        second = asyncio.create_task(queued())
+        await asyncio.sleep(0)
+
+        with pytest.raises(Rejected) as full:
+            await ctrl.acquire()
+        assert full.value.status_code == 503 and full.value.headers["Retry-After"] == "1"
+
+        with pytest.raises(Rejected) as late:
+            await ctrl.acquire(deadline=time.monotonic() - 1)
+        assert late.value.status_code == 504
+
+        release.set()
+        await asyncio.gather(first, second)
+        return ctrl, order
+
+    ctrl, order = asyncio.run(scenario())
+    stats = ctrl.stats()
+    assert order == ["first", "second"]
+    assert stats["accepted"] == 2 and stats["completed"] == 2
+    assert stats["shed_queue_full"] == 1 and stats["shed_deadline"] == 1
+    assert stats["inflight"] == 0 and stats["queued"] == 0
+    assert stats["queue_wait_ms"]["count"] == 2
+
+
+def test_deadline_passing_in_queue_frees_the_queue_position():
+    async def scenario():
+        ctrl = AdmissionController(max_inflight=1, max_queue=4)
+        await ctrl.acquire()
+        with pytest.raises(Rejected) as e:
+            await ctrl.acquire(deadline=time.monotonic() + 0.02)
+        assert e.value.status_code == 504
+        assert ctrl.stats()["queued"] == 0
+        ctrl.release()
+        await ctrl.acquire()  # slot is free again, no stale waiter holds it
+        return ctrl
+
+    assert asyncio.run(scenario()).inflight == 1
+
+
+def test_parse_deadline_headers():
+    assert parse_deadline({"x-request-timeout": "15"}, now=100.0) == 115.0
+    assert abs(parse_deadline({"x-request-deadline": str(time.time() + 5)}, now=0.0) - 5) < 0.5
+    assert parse_deadline({}, now=1.0) is None
+    with pytest.raises(ValueError):
+        parse_deadline({"x-request-timeout": "soon"})
+
+
+def test_predict_drops_expired_requests_before_inference(served_model, monkeypatch):
+    monkeypatch.setattr(served_model, "admission", AdmissionController(max_inflight=2, max_queue=2))
+    client = TestClient(served_model.app)
+
+    ok = client.post("/predict", json={"symptoms": ["fever"]}, headers={"X-Request-Timeout": "15"})
+    assert ok.status_code == 200
+    late = client.post("/predict", json={"symptoms": ["fever"]}, headers={"X-Request-Timeout": "0"})
+    assert late.status_code == 504
+    bad = client.post("/predict", json={"symptoms": ["fever"]}, headers={"X-Request-Timeout": "x"})
+    assert bad.status_code == 400
+
+    stats = client.get("/admission/stats").json()
+    assert stats["accepted"] == 1 and stats["shed_deadline"] == 1
+
+
+def test_background_inference_is_skipped_while_requests_queue(served_model, monkeypatch):
+    from cascade import CascadeStats
+
+    ctrl = AdmissionController(max_inflight=1, max_queue=4)
+    monkeypatch.setattr(served_model, "admission", ctrl)
+    monkeypatch.setattr(served_model, "cascade_stats", CascadeStats(verify_rate=1.0))
+    client = TestClient(served_model.app)
+    body = {"symptoms": ["ear_pain", "fever", "reduced_hearing"], "mode": "cascade"}
+
+    ctrl._waiters.append(object())  # a request waiting for an inference slot
+    assert client.post("/predict", json=body).json()["tier"] == "heuristic"
+    assert ctrl.stats()["background_skipped"] == {"cascade_verify": 1}
+    assert client.get("/cascade/stats").json()["agreement"]["checked"] == 0
+
+    ctrl._waiters.clear()
+    client.post("/predict", json=body)
+    assert client.get("/cascade/stats").json()["agreement"]["checked"] == 1
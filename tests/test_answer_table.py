@@ -0,0 +1,66 @@
+import gzip
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from answer_table import AnswerTable, build_table, collect_combinations, ensure_table, symptom_key
+
+
+def test_collect_combinations_ranks_logs_and_pins_presets(tmp_path):
+    freq = tmp_path / "freq.csv"
+    freq.write_text("symptoms,count\nfever;cough,5\nheadache,3\n")
+    audit = tmp_path / "audit"
+    audit.mkdir()
+    with gzip.open(audit / "audit_20250101_000000.jsonl.gz", "wt") as f:
+        for request in ({"symptoms": ["headache"]}, ["headache"], {"symptoms": ["headache"]}, {"symptoms": []}):
+            f.write(json.dumps({"request": request}) + "\n")
+        f.write('{"request": {"sympt')  # torn last line
+
+    combos = collect_combinations(str(freq), str(audit), extra=[["nausea"]], limit=2)
+    assert combos == [("nausea",), ("headache",)]  # headache: 3 from the file + 3 logged
+    assert collect_combinations(str(freq), str(audit), limit=10) == [("headache",), ("cough", "fever")]
+    assert symptom_key(["cough", " fever", "cough"]) == symptom_key(["fever", "cough"])
+
+
+def test_table_answers_match_model_and_follow_model_version(served_model, tmp_path, monkeypatch):
+    main = served_model
+    sets = [("fever", "cough"), ("headache", "nausea"), ("sneezing",)]
+    build_table(str(tmp_path), sets, lambda s: main._batch_model_predictions(s), main._urgency, "test-model", top_k=5)
+    table = AnswerTable(str(tmp_path / "table_test-model"))
+    assert len(table) == 3 and isinstance(table.keys, np.memmap)
+    assert list(table.keys) == sorted(table.keys)
+    assert table.lookup(["Fever", "cough "]) is not None
+    assert table.lookup(["fever", "cough", "made_up"]) is None  # not a precomputed set
+    monkeypatch.setattr(main, "answer_table", table)
+    client = TestClient(main.app)
+
+    body = {"symptoms": ["cough", "fever"]}
+    r = client.post("/predict", json=body).json()
+    assert r["tier"] == "table"
+    expected = main._model_predictions(["cough", "fever"])[:5]
+    assert [p["disease"] for p in r["predictions"]] == [p["disease"] for p in expected]
+    assert all(abs(a["probability"] - b["probability"]) < 1e-6 for a, b in zip(r["predictions"], expected))
+    assert r["urgency"] == main._urgency(["cough", "fever"], "")
+    assert client.post("/predict", json={**body, "description": "chest hurts"}).json()["urgency"]["level"] == "high"
+    assert client.post("/predict", json={"symptoms": ["fatigue"]}).json()["tier"] == "model"
+    assert client.get("/health").json()["answer_table"]["hits"] == 3
+
+    monkeypatch.setattr(main, "model_version", "newer-model")  # stale table is never served
+    assert client.post("/predict", json=body).json()["tier"] == "model"
+
+    rebuilt = ensure_table(str(tmp_path), "newer-model", lambda s: main._batch_model_predictions(s), main._urgency)
+    assert rebuilt.model_version == "newer-model" and len(rebuilt) == 3
+    assert rebuilt.meta["top_k"] == 5
+
+
+def test_loading_a_table_does_not_grow_the_vocabulary(tmp_path):
+    from symptom_vocab import VOCAB
+
+    sets = [("never_seen_symptom_a",), ("never_seen_symptom_b", "fever")]
+    build_table(str(tmp_path), sets, lambda chunk: [[{"disease": "x", "probability": 1.0}] for _ in chunk],
+                lambda s, d: {"level": "low", "recommendation": ""}, "v1")
+    size = len(VOCAB)
+    table = AnswerTable(str(tmp_path / "table_v1"))
+    assert table.lookup(["Fever", "never_seen_symptom_b"])[0] == [{"disease": "x", "probability": 1.0}]
+    assert len(VOCAB) == size
@@ -0,0 +1,80 @@
+import asyncio
+import gzip
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from audit_log import AuditSink
+
+
+def _read_all(directory):
+    records = []
+    for name in sorted(os.listdir(directory)):
+        with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+def test_sink_flushes_batches_and_drains_on_stop(tmp_path):
+    async def scenario():
+        sink = AuditSink(str(tmp_path), batch_size=3, flush_interval=0.01)
+        await sink.start()
+        for i in range(7):
+            assert sink.record({"i": i})
+        await asyncio.sleep(0.05)
+        sink.record({"i": 7})
+        await sink.stop()
+        return sink
+
+    sink = asyncio.run(scenario())
+    assert [r["i"] for r in _read_all(tmp_path)] == list(range(8))
+    assert sink.stats()["written"] == 8 and sink.stats()["queue_depth"] == 0
+
+
+def test_sink_drops_and_counts_when_queue_full(tmp_path):
+    sink = AuditSink(str(tmp_path), max_queue=2)
+    results = [sink.record({"i": i}) for i in range(5)]
+    assert results == [True, True, False, False, False]
+    assert sink.stats()["dropped_queue_full"] == 3
+
+
+def test_sink_rotates_files_by_size(tmp_path):
+    async def scenario():
+        sink = AuditSink(str(tmp_path), batch_size=1, max_file_bytes=1, max_files=3)
+        for i in range(5):
+            sink.record({"i": i, "pad": "x" * 50})
+        await sink.stop()
+        return sink
+
+    sink = asyncio.run(scenario())
+    assert len(os.listdir(tmp_path)) == 3
+    assert sink.stats()["rotations"] == 4
+
+
+def test_sink_keeps_rotated_files_by_default(tmp_path):
+    async def scenario():
+        sink = AuditSink(str(tmp_path), batch_size=1, max_file_bytes=1)
+        await sink.start()
+        for i in range(5):
+            sink.record({"i": i})
+        await sink.stop()
+
+    asyncio.run(scenario())
+    assert len(os.listdir(tmp_path)) == 5
+    assert [r["i"] for r in _read_all(tmp_path)] == list(range(5))
+
+
+def test_predict_records_audit_entry(served_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(served_model, "audit_sink", AuditSink(str(tmp_path)))
+    with TestClient(served_model.app) as client:
+        r = client.post("/predict", json={"symptoms": ["fever", "cough"], "description": ""})
+        assert r.status_code == 200
+        assert client.get("/health").json()["audit"]["enqueued"] == 1
+    records = _read_all(tmp_path)
+    assert len(records) == 1
+    rec = records[0]
+    assert rec["model_version"] == "test-model"
+    assert rec["request"]["symptoms"] == ["fever", "cough"]
+    assert rec["response"]["status"] == "success"
+    assert rec["latency_ms"] >= 0
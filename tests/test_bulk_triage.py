@@ -0,0 +1,100 @@
+import os
+import time
+import zipfile
+
+from fastapi.testclient import TestClient
+
+import bulk_triage
+from mock_predict_server import app as mock_app
+
+CSV = b"""\xef\xbb\xbfPatient_ID,Symptoms,Description
+p1,fever; cough;Fever,
+p2,headache nausea,throbbing
+,sneezing,
+p4,,
+"""
+
+
+def test_read_patients_normalizes_symptoms_and_ids():
+    patients = bulk_triage.read_patients(CSV)
+    assert [p["patient_id"] for p in patients] == ["p1", "p2", "3", "p4"]
+    assert patients[0]["symptoms"] == ["fever", "cough"]
+    assert patients[1] == {"patient_id": "p2", "symptoms": ["headache", "nausea"], "description": "throbbing"}
+
+
+class _Session:
+    """requests-like session backed by the mock server; can hide /predict/batch like an older server."""
+
+    def __init__(self, hide_batch=False):
+        self.client = TestClient(mock_app)
+        self.hide_batch = hide_batch
+        self.urls = []
+
+    def post(self, url, timeout=None, **kwargs):
+        self.urls.append(url)
+        if self.hide_batch and url.endswith("/batch"):
+            url = url.replace("/predict/batch", "/missing")
+        return self.client.post(url, **kwargs)
+
+
+def test_triage_batches_rows_and_keeps_order():
+    session = _Session()
+    seen = []
+    rows = bulk_triage.triage(bulk_triage.read_patients(CSV), "http://testserver/predict",
+                              batch_size=3, concurrency=2, session=session,
+                              progress=lambda done, total: seen.append((done, total)))
+    assert [r["patient_id"] for r in rows] == ["p1", "p2", "3", "p4"]
+    assert all(r["error"] is None for r in rows)
+    assert rows[1]["result"]["predictions"][0]["disease"].lower() == "migraine"
+    assert sorted(seen)[-1] == (4, 4) and len(seen) == 2
+    assert session.urls == ["http://testserver/predict/batch"] * 2
+
+
+def test_triage_falls_back_to_single_predict_calls():
+    session = _Session(hide_batch=True)
+    rows = bulk_triage.triage(bulk_triage.read_patients(CSV)[:2], "http://testserver/predict", session=session)
+    assert session.urls.count("http://testserver/predict") == 2
+    assert rows[0]["result"]["predictions"]
+
+
+def test_main_batch_endpoint_matches_single_predictions(served_model):
+    client = TestClient(served_model.app)
+    items = [{"symptoms": ["fever", "cough"]}, {"symptoms": []}, {"symptoms": ["headache", "nausea"]}]
+    body = client.post("/predict/batch", json={"items": items}).json()
+    assert [r["status"] for r in body["results"]] == ["success", "no_input", "success"]
+    single = client.post("/predict", json=items[2]).json()
+    assert body["results"][2]["predictions"] == single["predictions"]
+
+
+def test_build_report_zip_writes_one_pdf_per_triaged_patient(tmp_path):
+    rows = [
+        {"patient_id": "a/1", "symptoms": ["fever"], "description": "",
+         "result": {"predictions": [{"disease": "Influenza", "probability": 0.7}], "urgency": {"level": "medium"}}, "error": None},
+        {"patient_id": "b", "symptoms": ["cough"], "description": "", "result": None, "error": "HTTP 500"},
+        {"patient_id": "c", "symptoms": ["cough"], "description": "",
+         "result": {"predictions": [], "urgency": {}}, "error": None},
+    ]
+    progress = []
+    path = bulk_triage.build_report_zip(rows, str(tmp_path / "out.zip"), workers=1,
+                                        progress=lambda done, total: progress.append((done, total)))
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+        assert names[0] == "triage_summary.csv"
+        assert sorted(names[1:]) == ["0001_a_1.pdf", "0003_c.pdf"]
+        assert zf.read("0001_a_1.pdf").startswith(b"%PDF")
+        summary = zf.read("triage_summary.csv").decode()
+    assert "Influenza" in summary and "HTTP 500" in summary
+    assert progress[-1] == (2, 2)
+
+
+def test_new_zip_path_prunes_old_zips(tmp_path):
+    old, fresh, other = tmp_path / "old.zip", tmp_path / "fresh.zip", tmp_path / "keep.txt"
+    for f in (old, fresh, other):
+        f.write_bytes(b"x")
+    os.utime(old, (time.time() - 7200, time.time() - 7200))
+    os.utime(other, (time.time() - 7200, time.time() - 7200))
+
+    first = bulk_triage.new_zip_path(str(tmp_path), max_age_s=3600)
+    second = bulk_triage.new_zip_path(str(tmp_path), max_age_s=3600)
+    assert first != second and first.endswith(".zip")
+    assert not old.exists() and fresh.exists() and other.exists()
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from cascade import CascadeStats, heuristic_answer
+
+
+def test_heuristic_answer_confident_only_with_clear_margin():
+    preds, confident = heuristic_answer(["ear_pain", "fever", "reduced_hearing"], "", margin=0.25)
+    assert confident and preds[0]["disease"] == "otitis media"
+    _, confident = heuristic_answer(["fever"], "", margin=0.25)
+    assert not confident
+
+
+def test_cascade_stats_snapshot():
+    stats = CascadeStats(verify_rate=0.0)
+    stats.record("heuristic", 1.0)
+    stats.record("model", 5.0)
+    stats.record("model", 7.0)
+    stats.record_agreement(
+        [{"disease": "influenza"}, {"disease": "covid-19"}, {"disease": "common cold"}],
+        [{"disease": "Influenza"}, {"disease": "Pneumonia"}, {"disease": "Common Cold"}],
+    )
+    snap = stats.snapshot()
+    assert snap["hits"] == {"heuristic": 1, "model": 2}
+    assert abs(snap["hit_rate"]["heuristic"] - 1 / 3) < 1e-9
+    assert snap["latency_ms"]["model"]["count"] == 2
+    assert snap["agreement"]["top1_rate"] == 1.0
+    assert abs(snap["agreement"]["top3_overlap"] - 2 / 3) < 1e-9
+
+
+def test_predict_cascade_records_tier(served_model, monkeypatch):
+    monkeypatch.setattr(served_model, "audit_sink", None)
+    monkeypatch.setattr(served_model, "cascade_stats", CascadeStats(verify_rate=1.0))
+    client = TestClient(served_model.app)
+
+    fast = client.post("/predict", json={"symptoms": ["ear_pain", "fever", "reduced_hearing"], "mode": "cascade"})
+    assert fast.status_code == 200 and fast.json()["tier"] == "heuristic"
+
+    slow = client.post("/predict", json={"symptoms": ["fever", "cough"], "mode": "cascade"})
+    assert slow.json()["tier"] == "model"
+    assert slow.json()["predictions"][0]["disease"] in {"Influenza", "Common Cold", "Pneumonia", "Migraine"}
+
+    default = client.post("/predict", json={"symptoms": ["ear_pain", "fever", "reduced_hearing"]})
+    assert default.json()["tier"] == "model"
+
+    stats = client.get("/cascade/stats").json()
+    assert stats["hits"] == {"heuristic": 1, "model": 1}
+    assert stats["agreement"]["checked"] == 1  # background verification ran
+
+    assert client.post("/predict", json={"symptoms": ["fever"], "mode": "bogus"}).status_code == 400
@@ -0,0 +1,50 @@
+import numpy as np
+
+import compact_model as cm
+from train_disease_model import build_features, holdout_split, train_model
+
+
+def _split(df):
+    X, y, le = build_features(df)
+    return X, y, le, holdout_split(X, y, test_size=0.25)
+
+
+def test_holdout_split_keeps_every_class_in_train(symptom_df):
+    X, y, le, (X_train, X_test, y_train, y_test) = _split(symptom_df)
+    assert set(y_train) == set(range(len(le.classes_)))
+    assert len(X_train) + len(X_test) == len(X)
+
+
+def test_rank_features_covers_all_columns(symptom_df):
+    X, y, le, _ = _split(symptom_df)
+    model = train_model(X, y, num_class=len(le.classes_), n_estimators=10, max_depth=3)
+    ranking = cm.rank_features(model)
+    assert [f for f, _ in ranking] and set(f for f, _ in ranking) == set(X.columns)
+    gains = [g for _, g in ranking]
+    assert gains == sorted(gains, reverse=True)
+
+
+def test_evaluate_and_choose_candidate(symptom_df):
+    X, y, le, (X_train, X_test, y_train, y_test) = _split(symptom_df)
+    reference = train_model(X_train, y_train, num_class=len(le.classes_), n_estimators=10, max_depth=3)
+    ranking = cm.rank_features(reference)
+    grid = cm.candidate_grid(len(ranking), tree_counts=(10, 5), depths=(3,), fractions=(1.0, 0.5))
+    results = cm.evaluate_candidates(X_train, y_train, X_test, y_test, len(le.classes_), ranking, grid, batch_size=32)
+    assert len(results) == 4
+    for r in results:
+        assert 0.0 <= r["accuracy"] <= 1.0
+        assert r["row_p50_ms"] > 0 and r["batch_ms"] > 0
+
+    chosen = cm.choose_candidate(results, max_accuracy_drop=1.0)
+    assert chosen["row_p50_ms"] == min(r["row_p50_ms"] for r in results)
+
+
+def test_exported_model_serves_with_feature_names(symptom_df, tmp_path):
+    X, y, le, _ = _split(symptom_df)
+    ranking = [(f, 1.0) for f in X.columns]
+    chosen = {"n_estimators": 5, "max_depth": 2, "n_features": 3}
+    model = cm.export_candidate(X, y, le, ranking, chosen, str(tmp_path / "m.pkl"))
+    assert (tmp_path / "m_encoder.pkl").exists()
+    assert list(model.feature_names_in_) == list(X.columns[:3])
+    probs = model.predict_proba(X[list(model.feature_names_in_)].iloc[:2])
+    assert np.allclose(probs.sum(axis=1), 1.0, atol=1e-5)
@@ -0,0 +1,56 @@
+import asyncio
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from explain import ContributionExplainer
+
+
+def test_concurrent_requests_are_batched_joined_and_cached():
+    calls = []
+
+    def compute(symptom_sets, top_k, context):
+        calls.append(list(symptom_sets))
+        return [{"explanations": [{"n": len(s)}], "unknown_symptoms": []} for s in symptom_sets]
+
+    async def scenario():
+        explainer = ContributionExplainer(compute, batch_window_ms=20)
+        results = await asyncio.gather(
+            explainer.explain(["fever", "cough"], 3, "v1"),
+            explainer.explain(["cough", "fever"], 3, "v1"),  # same canonical set -> joined
+            explainer.explain(["headache"], 3, "v1"),
+        )
+        again = await explainer.explain(["FEVER", "cough"], 3, "v1")
+        other_version = await explainer.explain(["fever", "cough"], 3, "v2")
+        explainer.close()
+        return explainer, results, again, other_version
+
+    explainer, results, again, other_version = asyncio.run(scenario())
+    assert [r["explanations"][0]["n"] for r in results] == [2, 2, 1]
+    assert calls[0] == [("cough", "fever"), ("headache",)]
+    assert again is results[0]
+    stats = explainer.stats()
+    assert stats["joined_inflight"] == 1 and stats["cache_hits"] == 1
+    assert len(calls) == 2 and calls[1] == [("cough", "fever")]
+
+
+def test_explain_endpoint_contributions_add_up_to_margin(served_model, monkeypatch):
+    monkeypatch.setattr(served_model, "explainer", ContributionExplainer(served_model._explain_batch))
+    client = TestClient(served_model.app)
+    r = client.post("/explain", json={"symptoms": ["fever", "cough", "made_up"], "top_k": 2})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["unknown_symptoms"] == ["made_up"]
+    assert len(body["explanations"]) == 2
+
+    frame = served_model._build_batch_frame([("cough", "fever")])
+    margins = served_model.model.predict(frame, output_margin=True)[0]
+    labels = list(served_model.label_encoder.classes_)
+    for exp in body["explanations"]:
+        assert {c["symptom"] for c in exp["contributions"]} == {"cough", "fever"}
+        total = exp["bias"] + exp["other_features"] + sum(c["contribution"] for c in exp["contributions"])
+        assert np.isclose(total, margins[labels.index(exp["disease"])], atol=1e-4)
+
+    client.post("/explain", json={"symptoms": ["Cough", "fever", "made_up"], "top_k": 2})
+    assert client.get("/explain/stats").json()["cache_hits"] == 1
+    assert client.post("/explain", json={"symptoms": ["fever"], "top_k": "x"}).status_code == 400
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import incremental_train as it
+from conftest import make_symptom_df
+from train_disease_model import build_features, train_model
+
+
+def _base_model(df):
+    X, y, le = build_features(df)
+    return train_model(X, y, num_class=len(le.classes_), n_estimators=10, max_depth=3), le
+
+
+def test_extend_label_encoder_keeps_existing_ids(symptom_df):
+    _, le = _base_model(symptom_df)
+    encoder, new = it.extend_label_encoder(le, ["Asthma", "Zika"])
+    assert new == ["Zika"]
+    assert list(encoder.classes_[:len(le.classes_)]) == list(le.classes_)
+    assert encoder.transform(["Asthma"])[0] == le.transform(["Asthma"])[0]
+    assert encoder.transform(["Zika"])[0] == len(le.classes_)
+    assert len(le.classes_) == 4  # original encoder untouched
+
+
+def test_incremental_update_adds_rounds_on_partial_batch(symptom_df):
+    model, le = _base_model(symptom_df)
+    batch = make_symptom_df(20, seed=3, diseases=["Asthma", "Migraine"])  # only 2 of 4 classes
+    updated, encoder, info = it.incremental_update(model, le, batch, rounds=5)
+    assert info["mode"] == "incremental" and info["new_classes"] == []
+    assert updated.get_booster().num_boosted_rounds() == model.get_booster().num_boosted_rounds() + 5
+    assert list(encoder.classes_) == list(le.classes_)
+
+
+def test_new_feature_column_widens_booster_without_changing_old_trees(symptom_df):
+    model, le = _base_model(symptom_df)
+    batch = make_symptom_df(20, seed=4)
+    batch["Rash"] = np.where(np.arange(len(batch)) % 2 == 0, "Yes", "No")
+    X_new, _, _ = build_features(batch, le)
+    aligned, new_cols = it.align_features(X_new, list(model.feature_names_in_), model.get_booster().feature_types)
+    assert new_cols == ["Rash_No", "Rash_Yes"]
+
+    widened = it.widen_booster(model.get_booster(), aligned[new_cols])
+    import xgboost as xgb
+    before = model.predict_proba(aligned[list(model.feature_names_in_)])
+    after = widened.predict(xgb.DMatrix(aligned))
+    assert np.allclose(before, after, atol=1e-6)
+
+    updated, _, info = it.incremental_update(model, le, batch, rounds=3)
+    assert info["new_features"] == new_cols
+    assert list(updated.feature_names_in_[-2:]) == new_cols
+
+
+def test_new_class_requires_base_data_then_rebuilds(symptom_df):
+    model, le = _base_model(symptom_df)
+    batch = make_symptom_df(8, seed=5, diseases=["Zika", "Asthma"])
+    with pytest.raises(ValueError):
+        it.incremental_update(model, le, batch)
+    updated, encoder, info = it.incremental_update(model, le, batch, base_df=symptom_df)
+    assert info["mode"] == "rebuild" and info["new_classes"] == ["Zika"]
+    assert updated.n_classes_ == 5 and encoder.classes_[-1] == "Zika"
+
+
+def test_rebuild_keeps_tuned_hyperparameters(symptom_df):
+    X, y, le = build_features(symptom_df)
+    model = train_model(X, y, num_class=len(le.classes_), n_estimators=10, max_depth=3,
+                        subsample=0.7, colsample_bytree=0.5, min_child_weight=3)
+    batch = make_symptom_df(8, seed=6, diseases=["Zika", "Asthma"])
+    updated, _, info = it.incremental_update(model, le, batch, base_df=symptom_df)
+    assert info["mode"] == "rebuild"
+    params = updated.get_params()
+    assert (params["n_estimators"], params["max_depth"]) == (10, 3)
+    assert (params["subsample"], params["colsample_bytree"], params["min_child_weight"]) == (0.7, 0.5, 3)
@@ -0,0 +1,63 @@
+import threading
+
+from live_predict import LivePredictor, canonical_key
+
+
+def _fake_api(calls, gate=None):
+    def predict(symptoms, description):
+        calls.append(tuple(symptoms))
+        if gate is not None:
+            gate.wait(5)
+        return {"predictions": [{"disease": "+".join(symptoms), "probability": 1.0}]}, None
+    return predict
+
+
+def test_debounce_then_cache_hit_when_symptom_toggled_back():
+    calls = []
+    live = LivePredictor(_fake_api(calls), debounce_s=0.5)
+
+    live.update(["fever"], "", now=0.0)
+    assert live.tick(now=0.1)["status"] == "waiting"
+    live.update(["Fever", "cough"], "", now=0.2)  # typing continues: debounce restarts
+    assert live.tick(now=0.6)["status"] == "waiting"
+    assert live.tick(now=0.8)["status"] == "loading"
+    live._future.result()
+    ready = live.tick(now=0.9)
+    assert ready["status"] == "ready" and ready["result"]["predictions"][0]["disease"] == "cough+fever"
+    assert calls == [("cough", "fever")]
+
+    live.update(["fever"], "", now=1.0)
+    stale = live.tick(now=1.1)  # one symptom removed: keep the old ranking, marked stale
+    assert stale["status"] == "waiting" and stale["stale"] and stale["result"] is ready["result"]
+    live.update(["cough", "fever"], "", now=1.2)
+    assert live.tick(now=1.3)["status"] == "ready"  # back to a cached set, no new request
+    assert live.counters["cache_hits"] == 1 and calls == [("cough", "fever")]
+    live.close()
+
+
+def test_superseded_requests_are_cancelled_or_ignored():
+    calls, gate = [], threading.Event()
+    live = LivePredictor(_fake_api(calls, gate), debounce_s=0.0)
+
+    live.update(["fever"], "", now=0.0)
+    live.tick(now=0.0)  # starts running, blocked on the gate
+    running = live._future
+    live.update(["fever", "cough"], "", now=0.1)
+    live.tick(now=0.1)  # queued behind the running one
+    queued = live._future
+    live.update(["headache"], "", now=0.2)
+    assert queued.cancelled()
+    assert live.counters == {"submitted": 2, "cancelled": 1, "superseded": 1, "cache_hits": 0}
+
+    gate.set()
+    running.result()
+    state = live.tick(now=0.3)
+    assert state["status"] == "loading" and state["result"] is None  # old answer never shown
+    live._future.result()
+    assert live.tick(now=0.4)["result"]["predictions"][0]["disease"] == "headache"
+    assert calls == [("fever",), ("headache",)]
+    live.close()
+
+
+def test_canonical_key_normalizes_order_case_and_whitespace():
+    assert canonical_key(["Chest Pain", "fever"], " Bad  cough ") == canonical_key(["fever", "chest_pain"], "bad cough")
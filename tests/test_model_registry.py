@@ -0,0 +1,88 @@
+import json
+
+import joblib
+import pytest
+from fastapi.testclient import TestClient
+
+from model_registry import ModelNotFound, ModelRegistry
+
+from conftest import make_main_model
+
+
+@pytest.fixture
+def registry_config(tmp_path):
+    models = []
+    for i, (name, version) in enumerate([("eu", "v1"), ("eu", "v2"), ("us", "v1")]):
+        model, le = make_main_model(seed=i)
+        joblib.dump(model, tmp_path / f"{name}_{version}.pkl")
+        joblib.dump(le, tmp_path / f"{name}_{version}_encoder.pkl")
+        models.append({"name": name, "version": version,
+                       "model_path": f"{name}_{version}.pkl", "encoder_path": f"{name}_{version}_encoder.pkl"})
+    path = tmp_path / "registry.json"
+    path.write_text(json.dumps({"models": models}))
+    return str(path)
+
+
+def test_models_load_lazily_and_lru_is_evicted_over_budget(registry_config):
+    registry = ModelRegistry.from_config(registry_config)
+    assert not any(m["loaded"] for m in registry.stats()["models"].values())
+
+    mdl, encoder, version = registry.get("eu", "v1")
+    assert mdl is not None and list(encoder.classes_) and version == registry.resolve("eu", "v1").model_version
+    one_model = registry.resolve("eu", "v1").memory_bytes
+    registry.memory_budget_bytes = int(one_model * 2.5)  # room for two models
+
+    registry.get("eu")
+    assert registry.stats()["models"]["eu@v2"]["loaded"]  # no version -> latest registered
+    registry.get("eu", "v1")  # eu@v1 is now more recent than eu@v2
+    registry.get("us")
+    models = registry.stats()["models"]
+    assert [k for k, m in models.items() if m["loaded"]] == ["eu@v1", "us@v1"]
+    assert models["eu@v2"]["memory_bytes_estimate"] == 0
+    assert models["eu@v1"]["requests"] == 2 and models["eu@v1"]["loads"] == 1
+    assert registry.stats()["evictions"] == 1
+    assert registry.resident_bytes() <= registry.memory_budget_bytes
+
+    with pytest.raises(ModelNotFound):
+        registry.get("eu", "v9")
+
+
+def test_predict_selects_registry_model(served_model, registry_config, monkeypatch):
+    monkeypatch.setattr(served_model, "registry", ModelRegistry.from_config(registry_config))
+    client = TestClient(served_model.app)
+
+    r = client.post("/predict", json={"symptoms": ["fever", "cough"], "model": "us@v1"})
+    assert r.status_code == 200
+    assert r.json()["model"] == "us@v1"
+    assert client.post("/predict", json={"symptoms": ["fever"]}).json()["model"] == "default"
+    assert client.post("/predict", json={"symptoms": ["fever"], "model": "nope"}).status_code == 404
+
+    health = client.get("/health").json()
+    assert health["models"]["us@v1"]["loaded"] and health["models"]["us@v1"]["requests"] == 1
+    assert not health["models"]["eu@v1"]["loaded"]
+    assert health["models"]["us@v1"]["memory_bytes_estimate"] > 0
+
+
+def test_eviction_after_get_never_falls_back_to_default(served_model, registry_config, monkeypatch):
+    registry = ModelRegistry.from_config(registry_config)
+    monkeypatch.setattr(served_model, "registry", registry)
+    real_get = registry.get
+
+    def get_then_evict(name, version=None):
+        loaded = real_get(name, version)
+        registry.resolve(name, version).unload()  # a concurrent load evicted it
+        return loaded
+
+    monkeypatch.setattr(registry, "get", get_then_evict)
+    client = TestClient(served_model.app)
+    r = client.post("/predict", json={"symptoms": ["fever", "cough"], "model": "us@v1"}).json()
+    assert r["status"] == "success" and r["model"] == "us@v1"
+
+    us_model, us_encoder = make_main_model(seed=2)
+    expected = served_model._model_predictions(["fever", "cough"], mdl=us_model, encoder=us_encoder)
+    default = served_model._model_predictions(["fever", "cough"])
+    assert [p["probability"] for p in expected] != pytest.approx([p["probability"] for p in default])
+    assert [p["probability"] for p in r["predictions"]] == pytest.approx([p["probability"] for p in expected])
+
+    with pytest.raises(RuntimeError):
+        served_model._model_predictions(["fever"], mdl=None, encoder=us_encoder)
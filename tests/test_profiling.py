@@ -0,0 +1,84 @@
+import os
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import mock_predict_server as mps
+from profiling import ProfilerControl, ProfilingMiddleware, add_profiling_routes
+
+
+def test_disabled_profiler_takes_no_samples():
+    client = TestClient(mps.app)
+    mps.profiler.disable()
+    r = client.post("/predict", json={"symptoms": ["fever"], "description": ""})
+    assert r.status_code == 200
+    assert mps.profiler.status()["profiled"] == 0
+
+
+def _busy_app(control, token="secret"):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, control=control)
+    add_profiling_routes(app, control, token=token)
+
+    @app.get("/busy")
+    def busy():
+        deadline = time.perf_counter() + 0.03
+        while time.perf_counter() < deadline:
+            pass
+        return {"ok": True}
+
+    return app
+
+
+def test_enable_profile_and_dump_folded_stacks(tmp_path):
+    control = ProfilerControl(out_dir=str(tmp_path), interval=0.001, max_overhead=1.0)
+    client = TestClient(_busy_app(control), headers={"X-Profile-Token": "secret"})
+
+    status = client.post("/debug/profiling", json={"rate": 1.0, "window_seconds": 60}).json()
+    assert status["enabled"] and status["rate"] == 1.0
+    for _ in range(3):
+        assert client.get("/busy").status_code == 200
+
+    status = client.get("/debug/profiling").json()
+    assert status["profiled"] >= 3 and status["distinct_stacks"] > 0
+
+    dump = client.post("/debug/profiling/dump").json()
+    with open(dump["aggregate"], encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("test_profiling.py:busy" in line for line in lines)
+    assert any(r["path"] == "/busy" for r in dump["requests"])
+    assert os.path.isdir(dump["directory"])
+
+    assert client.post("/debug/profiling", json={"rate": 0}).json()["enabled"] is False
+
+
+def test_overhead_budget_skips_new_profiles():
+    control = ProfilerControl(max_overhead=0.0)
+    control.enable(1.0)
+    control.overhead_seconds = 1.0
+    assert control.start_sampler() is None
+    assert control.counters["skipped_budget"] == 1
+
+
+def test_window_expiry_disables():
+    control = ProfilerControl()
+    control.enable(1.0, window_seconds=-1)
+    assert control.start_sampler() is None
+    assert control.enabled is False
+
+
+def test_routes_refuse_without_token_and_reject_bad_numbers(tmp_path):
+    control = ProfilerControl(out_dir=str(tmp_path))
+    closed = TestClient(_busy_app(control, token=""))
+    assert closed.post("/debug/profiling", json={"rate": 1.0}).status_code == 403
+    assert closed.post("/debug/profiling/dump").status_code == 403
+    assert control.enabled is False and not os.listdir(tmp_path)
+
+    client = TestClient(_busy_app(control))
+    assert client.get("/debug/profiling", headers={"X-Profile-Token": "wrong"}).status_code == 403
+    client.headers["X-Profile-Token"] = "secret"
+    assert client.post("/debug/profiling", json={"rate": 1.0, "window_seconds": "soon"}).status_code == 400
+    status = client.post("/debug/profiling", json={"rate": "0.5", "window_seconds": "60"}).json()
+    assert status["enabled"] and status["rate"] == 0.5 and status["window_remaining_s"] > 0
@@ -0,0 +1,33 @@
+import search_model as sm
+from train_disease_model import build_features, holdout_split
+
+
+def test_sample_configs_are_unique_and_capped():
+    space = {"n_estimators": [10, 20], "max_depth": [2, 3]}
+    configs = sm.sample_configs(10, space=space)
+    assert len(configs) == 4
+    assert len({tuple(sorted(c.items())) for c in configs}) == 4
+
+
+def test_pareto_front_drops_dominated():
+    a = {"log_loss": 0.5, "row_p99_ms": 2.0, "serving_memory_bytes": 100}
+    b = {"log_loss": 0.4, "row_p99_ms": 3.0, "serving_memory_bytes": 100}
+    c = {"log_loss": 0.6, "row_p99_ms": 2.5, "serving_memory_bytes": 200}  # dominated by a
+    front = sm.pareto_front([a, b, c])
+    assert front == [b, a]
+    assert sm.pick_within_budget(front, 2.5) is a
+    assert sm.pick_within_budget(front, None) is b
+    assert sm.pick_within_budget(front, 1.0) is None
+
+
+def test_run_search_in_process_pool(symptom_df):
+    X, y, le = build_features(symptom_df)
+    X_train, X_test, y_train, y_test = holdout_split(X, y, test_size=0.25)
+    configs = [{"n_estimators": 5, "max_depth": 2}, {"n_estimators": 10, "max_depth": 3}]
+    results = sm.run_search(X_train, y_train, X_test, y_test, len(le.classes_), configs, workers=2)
+    assert len(results) == 2
+    for r in results:
+        assert "model_pickle" not in r
+        assert r["booster_size_bytes"] > 0 and r["row_p99_ms"] > 0 and r["log_loss"] > 0
+        assert r["serving_memory_bytes"] >= r["traced_bytes"] > 0
+    assert sm.pareto_front(results)
@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+
+from mock_predict_server import heuristic_predictions, heuristic_scores, heuristic_urgency
+from shadow import ShadowScorer
+
+
+def _heuristic_shadow(rate=1.0):
+    return ShadowScorer("heuristic", lambda s, d: heuristic_predictions(heuristic_scores(s, d)),
+                        heuristic_urgency, sample_rate=rate)
+
+
+def test_compare_aggregates_agreement_and_urgency():
+    shadow = _heuristic_shadow()
+    shadow.compare(["ear_pain", "fever", "reduced_hearing"], "",
+                   [{"disease": "Otitis Media"}, {"disease": "influenza"}, {"disease": "x"}],
+                   {"level": "low"}, 4.0)
+    snap = shadow.snapshot()
+    assert snap["compared"] == 1 and snap["top1_agreement"] == 1.0
+    assert snap["urgency_disagreement"] == 1.0
+    assert snap["urgency_pairs"] == {"low->medium": 1}
+    assert snap["latency_ms"]["primary"]["p50"] == 4.0
+
+
+def test_shadow_errors_are_counted():
+    def broken(s, d):
+        raise RuntimeError("boom")
+
+    shadow = ShadowScorer("broken", broken, heuristic_urgency)
+    shadow.compare(["fever"], "", [{"disease": "flu"}], {"level": "low"}, 1.0)
+    assert shadow.snapshot()["errors"] == 1 and shadow.snapshot()["compared"] == 0
+
+
+def test_predict_feeds_shadow_after_response(served_model, monkeypatch):
+    monkeypatch.setattr(served_model, "audit_sink", None)
+    client = TestClient(served_model.app)
+    assert client.get("/shadow/stats").json() == {"enabled": False}
+
+    monkeypatch.setattr(served_model, "shadow_scorer", _heuristic_shadow())
+    for _ in range(3):
+        assert client.post("/predict", json={"symptoms": ["fever", "cough"]}).status_code == 200
+    stats = client.get("/shadow/stats").json()
+    assert stats["enabled"] and stats["compared"] == 3
+    assert stats["latency_ms"]["shadow"]["count"] == 3
+
+
+def test_only_default_model_answers_are_shadowed(served_model, monkeypatch):
+    monkeypatch.setattr(served_model, "audit_sink", None)
+    monkeypatch.setattr(served_model, "shadow_scorer", _heuristic_shadow())
+    client = TestClient(served_model.app)
+    cascade = client.post("/predict", json={"symptoms": ["ear_pain", "fever", "reduced_hearing"], "mode": "cascade"})
+    assert cascade.json()["tier"] == "heuristic"
+    assert client.get("/shadow/stats").json()["compared"] == 0
+
+    assert client.post("/predict", json={"symptoms": ["fever", "cough"]}).json()["tier"] == "model"
+    assert client.get("/shadow/stats").json()["compared"] == 1
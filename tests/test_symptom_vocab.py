@@ -0,0 +1,33 @@
+import numpy as np
+
+from bench_symptom_vocab import _old_heuristic_scores, _old_input_frame, _old_urgency_level, _new_urgency_level, make_requests
+from mock_predict_server import heuristic_scores
+from symptom_vocab import FeatureMap, SymptomVocab, canonical, canonical_set
+
+
+def test_bits_normalize_and_never_intern_request_strings():
+    vocab = SymptomVocab(["fever", "Chest Pain"])
+    assert canonical(" Chest  Pain ") == "chest_pain"
+    assert canonical_set(["Chest Pain", "fever", "fever", " "]) == ("chest_pain", "fever")
+    assert vocab.bits(["FEVER", "chest pain", "made_up"]) == vocab.mask(["fever", "chest_pain"])
+    assert len(vocab) == 2  # "made_up" was not added
+    assert vocab.names(vocab.bits(["chest_pain", "fever"])) == ["fever", "chest_pain"]
+    packed = vocab.pack([vocab.mask(["fever"]), 0])
+    assert packed.shape == (2, 1) and packed[0, 0] == 1
+
+
+def test_feature_map_matches_dict_frame_in_any_column_order():
+    vocab = SymptomVocab()
+    features = ["sneezing", "fever", "Chest Pain", "cough"]
+    fmap = FeatureMap(features, vocab)
+    requests = [["fever", "chest_pain"], ["cough", "unknown"], []]
+    matrix = fmap.matrix([vocab.bits(r) for r in requests])
+    assert matrix.tolist() == [[0, 1, 1, 0], [0, 0, 0, 1], [0, 0, 0, 0]]
+    old = _old_input_frame(["fever", "Chest Pain"], features)
+    assert np.array_equal(old.to_numpy()[0], matrix[0])
+
+
+def test_bitset_paths_match_the_string_set_implementations():
+    for request in make_requests(300, seed=1):
+        assert heuristic_scores(request) == _old_heuristic_scores(request)
+        assert _new_urgency_level(request) == _old_urgency_level(request)
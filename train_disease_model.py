@@ -1,31 +1,114 @@
+import argparse
+import os
+
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import LabelEncoder
 from xgboost import XGBClassifier
 import joblib
 
-# Load the dataset
-df = pd.read_csv(r"C:\Users\s4BW\Downloads\archive (1)\Disease_symptom_and_patient_profile_dataset.csv")
+DATASET_PATH = r"C:\Users\s4BW\Downloads\archive (1)\Disease_symptom_and_patient_profile_dataset.csv"
+MODEL_PATH = "disease_xgb.pkl"
+ENCODER_PATH = "label_encoder.pkl"
+
+# Default training parameters (the compaction / search tools start from these)
+DEFAULT_PARAMS = {
+    "n_estimators": 300,
+    "max_depth": 8,
+    "learning_rate": 0.1,
+}
+
+
+def load_dataset(path: str = DATASET_PATH) -> pd.DataFrame:
+    return pd.read_csv(path)
+
+
+def build_features(df: pd.DataFrame, label_encoder: LabelEncoder | None = None):
+    """Split a dataset into one-hot features and encoded labels.
+
+    Returns (X, y_encoded, label_encoder). A new encoder is fitted when none is given.
+    """
+    if label_encoder is None:
+        # Encode the target variable (Disease)
+        label_encoder = LabelEncoder()
+        y_encoded = label_encoder.fit_transform(df["Disease"])
+    else:
+        y_encoded = label_encoder.transform(df["Disease"])
+
+    # One-hot encode the features (symptoms and other categorical variables)
+    X = pd.get_dummies(df.drop("Disease", axis=1))
+    return X, y_encoded, label_encoder
+
+
+def holdout_split(X, y_encoded, test_size: float = 0.2, seed: int = 42):
+    """Random train/test split that keeps at least one row of every class in train.
+
+    XGBoost requires the training labels to cover 0..num_class-1, and the dataset
+    has diseases with a single row, so a plain random split can break training.
+    """
+    y_encoded = np.asarray(y_encoded)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(y_encoded))
+    seen = set()
+    train_idx, rest = [], []
+    for i in order:
+        if y_encoded[i] not in seen:
+            seen.add(y_encoded[i])
+            train_idx.append(i)
+        else:
+            rest.append(i)
+    n_test = min(len(rest), int(round(len(y_encoded) * test_size)))
+    test_idx = rest[:n_test]
+    train_idx.extend(rest[n_test:])
+    train_idx, test_idx = sorted(train_idx), sorted(test_idx)
+    return X.iloc[train_idx], X.iloc[test_idx], y_encoded[train_idx], y_encoded[test_idx]
+
+
+def train_model(X, y_encoded, num_class: int, **params) -> XGBClassifier:
+    config = {**DEFAULT_PARAMS, **params}
+    model = XGBClassifier(
+        objective='multi:softprob',
+        num_class=num_class,
+        **config,
+    )
+    model.fit(X, y_encoded)
+    return model
+
+
+def encoder_path_for(model_path: str) -> str:
+    """Encoder path saved next to an exported model, e.g. disease_xgb_compact_encoder.pkl.
+
+    Keeps tools that export extra models from overwriting the served label_encoder.pkl.
+    """
+    stem, _ = os.path.splitext(model_path)
+    return f"{stem}_encoder.pkl"
+
+
+def save_model(model, label_encoder, model_path: str = MODEL_PATH, encoder_path: str = ENCODER_PATH):
+    joblib.dump(model, model_path)
+    joblib.dump(label_encoder, encoder_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the MediScan disease classifier")
+    parser.add_argument("--data", default=DATASET_PATH, help="Training CSV (must contain a 'Disease' column)")
+    parser.add_argument("--model-out", default=MODEL_PATH)
+    parser.add_argument("--encoder-out", default=ENCODER_PATH)
+    args = parser.parse_args()
+
+    # Load the dataset
+    df = load_dataset(args.data)
+    X, y_encoded, label_encoder = build_features(df)
 
-# Encode the target variable (Disease)
-label_encoder = LabelEncoder()
-y_encoded = label_encoder.fit_transform(df["Disease"])
+    # Train the model
+    model = train_model(X, y_encoded, num_class=len(label_encoder.classes_))
 
-# One-hot encode the features (symptoms and other categorical variables)
-X = pd.get_dummies(df.drop("Disease", axis=1))
+    # Save the model and label encoder
+    save_model(model, label_encoder, args.model_out, args.encoder_out)
 
-# Train the model
-model = XGBClassifier(
-    n_estimators=300,
-    max_depth=8,
-    learning_rate=0.1,
-    objective='multi:softprob',
-    num_class=len(label_encoder.classes_)
-)
-model.fit(X, y_encoded)
+    print("Model training completed successfully!")
+    print(f"Number of classes: {len(label_encoder.classes_)}")
 
-# Save the model and label encoder
-joblib.dump(model, "disease_xgb.pkl")
-joblib.dump(label_encoder, "label_encoder.pkl")
 
-print("Model training completed successfully!")
-print(f"Number of classes: {len(label_encoder.classes_)}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()